@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AvishanConfig(AppConfig):
     name = 'avishan'
+
+    def ready(self):
+        from avishan.signals import connect_signals
+        connect_signals()
@@ -1,4 +1,4 @@
-from typing import Union, Type, List
+from typing import Union, Type, List, Optional
 
 from avishan.descriptor import Project
 from django.conf import settings
@@ -70,9 +70,15 @@ class AvishanConfigFather:
     PROJECT: Project = None
     PROJECT_NAME: str = None
     MONITORED_APPS_NAMES: List[str] = []
+    """OpenApi spec urls under AVISHAN_URLS_START are not monitored either, see discard_monitor"""
     NOT_MONITORED_STARTS: List[str] = ['/admin', '/static', '/media', '/favicon.ico', '/api/av1/redoc']
     IGNORE_TRACKING_STARTS: List[str] = []
     AVISHAN_URLS_START = 'api/av1'
+    """
+    Load every model descriptor (fields, direct callables, documentation) at startup, to find errors early. Else each
+    model is loaded on first use
+    """
+    DESCRIPTOR_EAGER_LOAD: bool = False
     JWT_KEY: str = None
     USE_JALALI_DATETIME: bool = False
 
@@ -87,6 +93,18 @@ class AvishanConfigFather:
     DATE_STRING_FORMAT = '%Y-%m-%d'
     DATETIME_STRING_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
 
+    """
+    Returned querysets will be loaded with select_related/prefetch_related for relations serialized by to_dict, up to
+    this depth. 0 disables it
+    """
+    TO_DICT_RELATED_MAX_DEPTH: int = 3
+
+    """Objects fetched from database per chunk, when response is streamed using "stream" url parameter"""
+    STREAM_RESPONSE_CHUNK_SIZE: int = 500
+
+    """Count of generated django-filter FilterSet classes kept, per model and used fields. 0 disables caching"""
+    DJANGO_FILTER_CLASS_CACHE_SIZE: int = 1000
+
     LANGUAGE = LANGUAGES.EN
     NEW_USERS_LANGUAGE = None
     ASYNC_AVAILABLE: bool = False
@@ -163,6 +181,20 @@ class AvishanConfigFather:
     POA_VERIFICATION_VALID_SECONDS = 10 * 60
     POA_VERIFICATION_GAP_SECONDS = 60
 
+    # Email Otp Authentication
+    EMAIL_OTP_AUTHENTICATION_VERIFICATION_REQUIRED: bool = True
+    EMAIL_OTP_AUTHENTICATION_VERIFICATION_CODE_DOMAIN: str = '1234567890'
+    EMAIL_OTP_AUTHENTICATION_VERIFICATION_CODE_LENGTH: int = 6
+    EMAIL_OTP_AUTHENTICATION_VERIFICATION_CODE_VALID_SECONDS: int = 30 * 60
+    EMAIL_OTP_AUTHENTICATION_VERIFICATION_CODE_GAP_SECONDS: int = 2 * 60 - 10
+
+    # Phone Otp Authentication
+    PHONE_OTP_AUTHENTICATION_VERIFICATION_REQUIRED: bool = True
+    PHONE_OTP_AUTHENTICATION_VERIFICATION_CODE_DOMAIN: str = '1234567890'
+    PHONE_OTP_AUTHENTICATION_VERIFICATION_CODE_LENGTH: int = 4
+    PHONE_OTP_AUTHENTICATION_VERIFICATION_CODE_VALID_SECONDS: int = 10 * 60
+    PHONE_OTP_AUTHENTICATION_VERIFICATION_CODE_GAP_SECONDS: int = 60
+
     # Faker
     FAKER_LOCALE: str = 'fa_IR'
     FAKER_SEED: int = None
@@ -170,8 +202,87 @@ class AvishanConfigFather:
     #  Firebase
     FIREBASE_SERVER_TOKEN: Union[str, dict] = ''
 
-    # VisitorToken
-    VISITOR_KEY_LENGTH = 40
+    # Visitor Key Authentication
+    """Renamed from VISITOR_KEY_LENGTH, which was never read, to match other authentication type settings"""
+    VISITOR_KEY_AUTHENTICATION_KEY_LENGTH: int = 40
+
+    # Request Tracking
+    """Write RequestTrack objects from a background thread in batches, instead of inside request"""
+    REQUEST_TRACK_ASYNC_WRITE: bool = False
+    REQUEST_TRACK_BUFFER_SIZE: int = 10000
+    REQUEST_TRACK_FLUSH_SIZE: int = 100
+    REQUEST_TRACK_FLUSH_INTERVAL_SECONDS: float = 2
+    """If buffer is full, drop new tracks. Else request waits until there is room in buffer"""
+    REQUEST_TRACK_DROP_ON_FULL: bool = True
+    """Chance of tracking a request, between 0 and 1"""
+    REQUEST_TRACK_SAMPLE_RATE: float = 1.0
+    """
+    First matching rule overrides REQUEST_TRACK_SAMPLE_RATE. Each rule is a dict with "sample_rate" key and optional
+    "url_pattern" (regex), "model" (model class name) and "status_codes" (list of ints) keys. example:
+    {'url_pattern': r'^/api/av1/countries', 'status_codes': [200], 'sample_rate': 0.01}
+    """
+    REQUEST_TRACK_RULES: List[dict] = []
+    REQUEST_TRACK_ALWAYS_ON_EXCEPTION: bool = True
+    """Requests slower than this will be tracked regardless of sampling. None disables it"""
+    REQUEST_TRACK_SLOW_MILLISECONDS: Optional[int] = None
+    """Request and response bodies longer than this will be truncated. None means no limit"""
+    REQUEST_TRACK_BODY_MAX_LENGTH: Optional[int] = None
+
+    # Authentication Cache
+    """
+    Cache authentication objects (with their user_user_group, base_user and user_group) in django cache, so that
+    authenticated requests skip loading them from database. Login, logout and deactivations invalidate it.
+    """
+    AUTHENTICATION_CACHE_ENABLE: bool = False
+    AUTHENTICATION_CACHE_ALIAS: str = 'default'
+    AUTHENTICATION_CACHE_SECONDS: int = 5 * 60
+
+    # Query Tracking
+    """
+    Count and time database queries of each request, saved in RequestTrack. It is a diagnostic: every query goes
+    through an execute wrapper and keeps its SQL text. None follows django DEBUG setting
+    """
+    QUERY_TRACKING_ENABLE: Optional[bool] = None
+    """Slowest statements and most repeated statements kept for each request"""
+    QUERY_TRACKING_SLOWEST_COUNT: int = 5
+    QUERY_TRACKING_DUPLICATES_COUNT: int = 5
+    """Send query count, time and duplicates in "X-Avishan-Queries" response header. Meant for development"""
+    QUERY_TRACKING_DEBUG_HEADER: bool = False
+
+    # Response Cache
+    """Cache used for responses of models with response_cache_seconds"""
+    RESPONSE_CACHE_ALIAS: str = 'default'
+
+    # Search
+    """
+    "auto" uses indexed search of database (postgres tsvector, sqlite fts5) for models declaring search_fields.
+    "contains" always uses icontains
+    """
+    SEARCH_BACKEND: str = 'auto'
+    """Text search configuration of postgres search vectors and queries"""
+    SEARCH_POSTGRES_CONFIG: str = 'simple'
+
+    # Bulk Create
+    BULK_CREATE_MAX_ITEMS: int = 1000
+    BULK_CREATE_BATCH_SIZE: int = 500
+
+    # Token Reissue
+    """
+    Incoming token will be sent back in response until this fraction of its lifetime passed, then a new one will be
+    created. 0 creates new token for every response
+    """
+    TOKEN_REISSUE_AFTER_FRACTION: float = 0.5
+
+    # Token Cache
+    """Count of verified tokens kept in memory, to skip jwt.decode for repeated tokens. 0 disables it"""
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Authentication Last Used
+    """"last_used" of authentication objects will be written only when stored value is older than this"""
+    AUTHENTICATION_LAST_USED_GRANULARITY_SECONDS: int = 60
+    """Write "last_used" updates from a background thread in batches, instead of inside request"""
+    AUTHENTICATION_LAST_USED_ASYNC_WRITE: bool = False
+    AUTHENTICATION_LAST_USED_FLUSH_INTERVAL_SECONDS: float = 10
 
     # open api
     REQUEST_COMMON_URL_PARAMETERS = [{
@@ -194,6 +305,10 @@ class AvishanConfigFather:
     OPENAPI_APPLICATION_VERSION = 'NOT_SET'
     """List of OpenApi.Server"""
     OPENAPI_APPLICATION_SERVERS: list = []
+    """Build OpenApi spec when server starts, instead of on first request to spec urls"""
+    OPENAPI_SPEC_BUILD_ON_STARTUP: bool = False
+    """Cache-Control max-age of spec urls. Clients revalidate with ETag after it"""
+    OPENAPI_SPEC_MAX_AGE_SECONDS: int = 60
 
     CRUD_AUTHENTICATE = {}
 
@@ -226,6 +341,44 @@ class AvishanConfigFather:
         """
         pass
 
+    @classmethod
+    def should_track_request(cls, request) -> bool:
+        """
+        Called after response created, for requests marked as tracked or having exception. Decides if RequestTrack
+        should be saved, based on "Request Tracking" policy settings.
+        """
+        from avishan.misc.tracking import get_request_track_policy
+        return get_request_track_policy().should_track(request)
+
+    @classmethod
+    def query_tracking_enabled(cls) -> bool:
+        if cls.QUERY_TRACKING_ENABLE is None:
+            return settings.DEBUG
+        return cls.QUERY_TRACKING_ENABLE
+
+    @classmethod
+    def authentication_type_settings(cls, authentication_type_class: type) -> 'AuthenticationTypeSettings':
+        """
+        Settings bundle of authentication type class, resolved once.
+        """
+        try:
+            return _authentication_type_settings[authentication_type_class]
+        except KeyError:
+            pass
+        created = AuthenticationTypeSettings(cls, authentication_type_class)
+        _authentication_type_settings[authentication_type_class] = created
+        return created
+
+    @classmethod
+    def check_authentication_type_settings(cls):
+        """
+        Resolves settings of every authentication type model, so missing ones raise at startup.
+        """
+        from avishan.models import AvishanModel, AuthenticationType
+        for model in AvishanModel.get_non_abstract_models():
+            if issubclass(model, AuthenticationType):
+                cls.authentication_type_settings(model)
+
     @classmethod
     def get_otp_users(cls) -> List[Type]:
         return []
@@ -320,8 +473,41 @@ class AvishanConfigFather:
         ]
 
 
+class AuthenticationTypeSettings:
+    """
+    Config values of an authentication type class, listed in its "authentication_settings_names". Upper case names
+    are read from "<CLASS_NAME>_<NAME>" attributes and lower case ones from "<class_name>_<name>" methods of config.
+    Values are available as lower case attributes, like "settings.verification_code_length".
+    """
+
+    def __init__(self, config: Type[AvishanConfigFather], authentication_type_class: type):
+        import stringcase
+
+        self.authentication_type_class = authentication_type_class
+        class_name = authentication_type_class.__name__
+        for name in authentication_type_class.authentication_settings_names:
+            if name.isupper():
+                attribute_name = stringcase.constcase(class_name) + '_' + name
+            else:
+                attribute_name = stringcase.snakecase(class_name) + '_' + name
+            if not hasattr(config, attribute_name):
+                raise ImproperlyConfigured(f'"{attribute_name}" not found in AvishanConfigFather inherited class')
+            setattr(self, name.lower(), getattr(config, attribute_name))
+
+
+_avishan_config: Optional[Type[AvishanConfigFather]] = None
+_authentication_type_settings: dict = {}
+
+
 def get_avishan_config() -> Union[Type[AvishanConfigFather]]:
+    """
+    Project config class. Result is kept after first found subclass, to skip scanning subclasses on every call.
+    """
+    global _avishan_config
+    if _avishan_config is not None:
+        return _avishan_config
     for sub_class in AvishanConfigFather.__subclasses__():
         sub_class: Type[AvishanConfigFather]
+        _avishan_config = sub_class
         return sub_class
     return AvishanConfigFather
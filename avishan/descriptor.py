@@ -1,24 +1,71 @@
 import inspect
 import datetime
+import sys
+import threading
 from enum import Enum, auto
-from typing import List, Callable, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import List, Callable, Optional, Tuple, Union, TYPE_CHECKING
 
-import docstring_parser
 import stringcase
 from django.apps import apps
 from django.conf import settings
 from django.db import models
 from django.db.models.base import ModelBase
-from djmoney.models.fields import MoneyField
-from docstring_parser import DocstringMeta, DocstringParam
 
 from avishan.misc import status
 
+if TYPE_CHECKING:
+    from docstring_parser import DocstringParam
+
+"""Guards lazy loading of descriptor parts. Reentrant, as loading a model may look up others"""
+_descriptor_lock = threading.RLock()
+
+
+def money_field_class() -> Optional[type]:
+    """djmoney MoneyField, only if djmoney is already imported. Models having MoneyField import it themselves"""
+    module = sys.modules.get('djmoney.models.fields', None)
+    return getattr(module, 'MoneyField', None)
+
 
 class Project:
     def __init__(self, name: str):
         self.name: str = name
         self.apps: List[DjangoApplication] = self.load_apps()
+        self.build_indexes()
+
+    def build_indexes(self):
+        """
+        Lookup tables used for routing requests, so finding model and direct callable for each request does not scan
+        every model. Direct callables of each model are indexed on first lookup, as model methods are loaded lazily.
+        """
+        models_by_name = {}
+        models_by_plural_name = {}
+        models_by_snake_case_plural_name = {}
+        models_by_target = {}
+        for model in self.models_pool():
+            models_by_name.setdefault(model.name, model)
+            models_by_plural_name.setdefault(model.target.class_plural_name(), model)
+            models_by_snake_case_plural_name.setdefault(model.target.class_plural_snake_case_name(), model)
+            models_by_target.setdefault(model.target, model)
+
+        self._models_by_name = MappingProxyType(models_by_name)
+        self._models_by_plural_name = MappingProxyType(models_by_plural_name)
+        self._models_by_snake_case_plural_name = MappingProxyType(models_by_snake_case_plural_name)
+        self._models_by_target = MappingProxyType(models_by_target)
+        self._direct_callables = {}
+        self._direct_callables_indexed_models = set()
+
+    def _index_direct_callables(self, model: type):
+        with _descriptor_lock:
+            if model in self._direct_callables_indexed_models:
+                return
+            descripted = self._models_by_target.get(model, None)
+            if descripted is not None:
+                for direct_callable in descripted.methods:
+                    self._direct_callables.setdefault((model, direct_callable.name, direct_callable.method),
+                                                      direct_callable)
+                    self._direct_callables.setdefault((model, direct_callable.name, None), direct_callable)
+            self._direct_callables_indexed_models.add(model)
 
     def load_apps(self) -> List['DjangoApplication']:
         from avishan.configure import get_avishan_config
@@ -33,12 +80,28 @@ class Project:
 
     def find_model(self, name: str = None, plural_name: str = None, snake_case_plural_name: str = None) -> Optional[
         'DjangoAvishanModel']:
-        for model in self.models_pool():
-            if (name and model.name == name) or \
-                    (plural_name and model.target.class_plural_name() == plural_name) or \
-                    (snake_case_plural_name and model.target.class_plural_name() == stringcase.pascalcase(
-                        snake_case_plural_name)):
-                return model
+        if name and name in self._models_by_name.keys():
+            return self._models_by_name[name]
+        if plural_name and plural_name in self._models_by_plural_name.keys():
+            return self._models_by_plural_name[plural_name]
+        if snake_case_plural_name:
+            if snake_case_plural_name in self._models_by_snake_case_plural_name.keys():
+                return self._models_by_snake_case_plural_name[snake_case_plural_name]
+            return self._models_by_plural_name.get(stringcase.pascalcase(snake_case_plural_name), None)
+        return None
+
+    def find_direct_callable(self, model: type, name: str, method: Union['ApiMethod.METHOD', str] = None) -> \
+            Optional['DirectCallable']:
+        """
+        Finds model direct callable with this name. If method passed, callable with same http method is preferred.
+        """
+        if model not in self._direct_callables_indexed_models:
+            self._index_direct_callables(model)
+        if isinstance(method, str):
+            method = ApiMethod.METHOD.__members__.get(method.upper(), None)
+        if method is not None and (model, name, method) in self._direct_callables.keys():
+            return self._direct_callables[(model, name, method)]
+        return self._direct_callables.get((model, name, None), None)
 
     def __str__(self):
         return self.name
@@ -79,18 +142,64 @@ class DjangoAvishanModel(DataModel):
     """
 
     def __init__(self, app: DjangoApplication, target):
+        """
+        Attributes, description and methods are loaded on first use, unless DESCRIPTOR_EAGER_LOAD is set. Requests
+        need only methods of requested model, and the rest is used in OpenApi export.
+        """
+        from avishan.configure import get_avishan_config
         from avishan.models import AvishanModel
 
         self.target: AvishanModel = target
-        super().__init__(
-            name=target._meta.object_name,
-            attributes=self.extract_attributes(),
-            description=self.target._model_description()
-        )
+        self.name = target._meta.object_name
         self.app: DjangoApplication = app
-        self.methods = self.extract_methods()
-        self.parse_auto_resolves()
-        self.prepare_docs()
+        self._attributes: Optional[List[DjangoFieldAttribute]] = None
+        self._description: Optional[str] = None
+        self._description_loaded: bool = False
+        self._methods: Optional[List[DirectCallable]] = None
+        if get_avishan_config().DESCRIPTOR_EAGER_LOAD:
+            self.load()
+
+    def load(self):
+        return self.attributes, self.description, self.methods
+
+    @property
+    def attributes(self) -> List['DjangoFieldAttribute']:
+        if self._attributes is None:
+            with _descriptor_lock:
+                if self._attributes is None:
+                    self._attributes = self.extract_attributes()
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value: List['DjangoFieldAttribute']):
+        self._attributes = value
+
+    @property
+    def description(self) -> Optional[str]:
+        if not self._description_loaded:
+            with _descriptor_lock:
+                if not self._description_loaded:
+                    self._description = self.target._model_description()
+                    self._description_loaded = True
+        return self._description
+
+    @description.setter
+    def description(self, value: Optional[str]):
+        self._description = value
+        self._description_loaded = True
+
+    @property
+    def methods(self) -> List['DirectCallable']:
+        if self._methods is None:
+            with _descriptor_lock:
+                if self._methods is None:
+                    self._methods = self.extract_methods()
+                    self.prepare_docs()
+        return self._methods
+
+    @methods.setter
+    def methods(self, value: List['DirectCallable']):
+        self._methods = value
 
     @property
     def direct_callables(self) -> List['DirectCallable']:
@@ -127,36 +236,6 @@ class DjangoAvishanModel(DataModel):
         # todo extract methods here, not only apis
         return self.target.direct_callable_methods()
 
-    def parse_auto_resolves(self):
-        """auto resolve request body"""
-        for item in self.methods:
-            if item.documentation is None:
-                continue
-            if item.documentation.request_body is not None \
-                    and isinstance(item.documentation.request_body.attributes,
-                                   RequestBodyDocumentation.AutoResolveRequestBody):
-                item.documentation.request_body.attributes = item.args
-
-            if item.authenticate and item.documentation.response_bodies:
-                item.documentation.response_bodies.append(
-                    ResponseBodyDocumentation(
-                        title='Authentication error',
-                        status_code=status.HTTP_403_FORBIDDEN
-                    )
-                )
-            if item.documentation.request_body:
-                related_names = []
-                for attribute in item.documentation.request_body.attributes:
-                    if attribute.type is Attribute.TYPE.OBJECT:
-                        related_names.append(attribute.type_of.class_name())
-                if len(related_names) > 0:
-                    item.documentation.response_bodies.append(
-                        ResponseBodyDocumentation(
-                            title=f'Related object of one of these types not found: {", ".join(related_names)}',
-                            status_code=status.HTTP_404_NOT_FOUND
-                        )
-                    )
-
     def is_abstract(self) -> bool:
         return self.target._meta.abstract
 
@@ -173,6 +252,7 @@ class Function:
         self.long_description: Optional[str] = None
         self.args: List[Attribute] = self.load_args_from_signature(self.target)
         self.returns: Optional[Attribute] = None
+        import docstring_parser
         self._doc = docstring_parser.parse(target.__doc__)
         if self.__class__ == Function:
             self.load_from_doc()
@@ -251,6 +331,8 @@ class ApiMethod(Method):
         self.responses = self.load_responses_from_doc()
 
     def load_responses_from_doc(self) -> List['ApiMethod.RESPONSE']:
+        from docstring_parser import DocstringMeta
+
         responses = []
         for item in self._doc.meta:
             if not isinstance(item, DocstringMeta):
@@ -282,8 +364,12 @@ class DirectCallable(ApiMethod):
                  authenticate: bool = True,
                  hide_in_redoc: bool = False,
                  is_class_method: bool = None,
-                 documentation: 'ApiDocumentation' = None
+                 documentation: Union['ApiDocumentation', Callable[[], 'ApiDocumentation']] = None
                  ):
+        """
+        Routing uses name, method, url, authenticate and args. Documentation may be passed as a function building it,
+        so titles, examples and response bodies are built on first use, which is usually OpenApi export.
+        """
         from avishan.configure import get_avishan_config
         from avishan.models import AvishanModel
         model: AvishanModel
@@ -311,7 +397,65 @@ class DirectCallable(ApiMethod):
             self.url = '/' + get_avishan_config().AVISHAN_URLS_START + f'/{model.class_plural_snake_case_name()}/' \
                        + '{id}' + url
 
-        self.documentation = documentation
+        self._documentation: Optional[ApiDocumentation] = None
+        self._documentation_factory: Optional[Callable[[], ApiDocumentation]] = None
+        self._documentation_updaters: List[Callable[[ApiDocumentation], None]] = []
+        if callable(documentation):
+            self._documentation_factory = documentation
+        else:
+            self.documentation = documentation
+
+    @property
+    def documentation(self) -> Optional['ApiDocumentation']:
+        if self._documentation_factory is not None:
+            with _descriptor_lock:
+                if self._documentation_factory is not None:
+                    documentation = self._documentation_factory()
+                    for updater in self._documentation_updaters:
+                        updater(documentation)
+                    self.documentation = documentation
+        return self._documentation
+
+    @documentation.setter
+    def documentation(self, value: Optional['ApiDocumentation']):
+        self._documentation_factory = None
+        self._documentation_updaters = []
+        self._documentation = value
+        if value is not None:
+            self.resolve_documentation(value)
+
+    def update_documentation(self, updater: Callable[['ApiDocumentation'], None]):
+        """Changes documentation when it is built, or now if it is already built"""
+        if self._documentation_factory is not None:
+            self._documentation_updaters.append(updater)
+        elif self._documentation is not None:
+            updater(self._documentation)
+
+    def resolve_documentation(self, documentation: 'ApiDocumentation'):
+        """auto resolve request body"""
+        if documentation.request_body is not None \
+                and isinstance(documentation.request_body.attributes, RequestBodyDocumentation.AutoResolveRequestBody):
+            documentation.request_body.attributes = self.args
+
+        if self.authenticate and documentation.response_bodies:
+            documentation.response_bodies.append(
+                ResponseBodyDocumentation(
+                    title='Authentication error',
+                    status_code=status.HTTP_403_FORBIDDEN
+                )
+            )
+        if documentation.request_body:
+            related_names = []
+            for attribute in documentation.request_body.attributes:
+                if attribute.type is Attribute.TYPE.OBJECT:
+                    related_names.append(attribute.type_of.class_name())
+            if len(related_names) > 0:
+                documentation.response_bodies.append(
+                    ResponseBodyDocumentation(
+                        title=f'Related object of one of these types not found: {", ".join(related_names)}',
+                        status_code=status.HTTP_404_NOT_FOUND
+                    )
+                )
 
     def __str__(self):
         return f'{self.model.class_name()}.{self.name}'
@@ -344,7 +488,7 @@ class Attribute:
     _TYPE_POOL = {
         TYPE.STRING: (str, models.CharField, models.TextField),
         TYPE.INT: (int, models.IntegerField, models.AutoField),
-        TYPE.FLOAT: (float, models.FloatField, MoneyField),
+        TYPE.FLOAT: (float, models.FloatField),
         TYPE.DATE: (datetime.date, models.DateField),
         TYPE.TIME: (datetime.time, models.TimeField),
         TYPE.DATETIME: (datetime.datetime, models.DateTimeField),
@@ -381,7 +525,7 @@ class Attribute:
         self._doc = None
 
     @classmethod
-    def create_from_doc_param(cls, doc_param: DocstringParam) -> 'Attribute':
+    def create_from_doc_param(cls, doc_param: 'DocstringParam') -> 'Attribute':
         return Attribute(
             name=doc_param.arg_name,
             type=Attribute.create_type_from_doc_param(doc_param.type_name),
@@ -428,6 +572,11 @@ class Attribute:
         except ImportError:
             pass
 
+        money_field = money_field_class()
+        if money_field is not None and (entry is money_field or isinstance(entry, money_field) or (
+                inspect.isclass(entry) and issubclass(entry, money_field))) or entry == 'MoneyField':
+            return Attribute.TYPE.FLOAT
+
         for target, pool in Attribute._TYPE_POOL.items():
             for swimmer in pool:
                 if entry is swimmer:
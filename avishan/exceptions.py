@@ -175,10 +175,10 @@ def save_traceback():
         return
     import sys, traceback
     exc_type, exc_value, exc_tb = sys.exc_info()
-    tbe = traceback.TracebackException(
-        exc_type, exc_value, exc_tb,
-    )
-    if tbe.exc_traceback is not None:
+    if exc_tb is not None:
+        tbe = traceback.TracebackException(
+            exc_type, exc_value, exc_tb,
+        )
         request.avishan.traceback = ''.join(tbe.format())
         if request.avishan.debug:
             print(request.avishan.traceback)
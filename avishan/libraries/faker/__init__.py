@@ -5,14 +5,24 @@ from inspect import Parameter
 
 # todo fake_tree gets list of models needed to be faked. choose relation from themself not independent objects
 from django.db import models
-from faker import Faker
 
 from avishan.configure import get_avishan_config
 
+"""Created on first use, so importing models does not import faker"""
+_faker = None
+
 
 class AvishanFaker:
-    _faker = Faker(locale=get_avishan_config().FAKER_LOCALE)
-    Faker.seed(get_avishan_config().FAKER_SEED)
+
+    @staticmethod
+    def _get_faker():
+        global _faker
+        if _faker is None:
+            from faker import Faker
+
+            Faker.seed(get_avishan_config().FAKER_SEED)
+            _faker = Faker(locale=get_avishan_config().FAKER_LOCALE)
+        return _faker
 
     @classmethod
     def fake_it(cls, **overriding):
@@ -100,15 +110,15 @@ class AvishanFaker:
 
     @classmethod
     def _bool_fake(cls) -> bool:
-        return cls._faker.pybool()
+        return cls._get_faker().pybool()
 
     @classmethod
     def _str_fake(cls) -> str:
-        return " ".join(cls._faker.words(8))
+        return " ".join(cls._get_faker().words(8))
 
     @classmethod
     def _int_fake(cls) -> int:
-        return cls._faker.pyint(min_value=0, max_value=100000)
+        return cls._get_faker().pyint(min_value=0, max_value=100000)
 
     @classmethod
     def _float_fake(cls,
@@ -118,7 +128,7 @@ class AvishanFaker:
                     min_value: Optional[float] = 0,
                     max_value: Optional[float] = None
                     ) -> float:
-        return cls._faker.pyfloat(
+        return cls._get_faker().pyfloat(
             left_digits=left_digits,
             right_digits=right_digits,
             positive=positive,
@@ -128,12 +138,12 @@ class AvishanFaker:
 
     @classmethod
     def _datetime_fake(cls) -> datetime:
-        return cls._faker.date_time()
+        return cls._get_faker().date_time()
 
     @classmethod
     def _date_fake(cls) -> date:
-        return cls._faker.date_object()
+        return cls._get_faker().date_object()
 
     @classmethod
     def _time_fake(cls) -> time:
-        return cls._faker.time_object()
+        return cls._get_faker().time_object()
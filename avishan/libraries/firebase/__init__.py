@@ -1,10 +1,16 @@
-from requests import post, Response
+from typing import TYPE_CHECKING
+
 from avishan.configure import get_avishan_config
 
+if TYPE_CHECKING:
+    import requests
+
 FIREBASE_SERVER_TOKEN = get_avishan_config().FIREBASE_SERVER_TOKEN
 
 
-def send_firebase_data_message(data: dict, to_key: str, server_key: str = FIREBASE_SERVER_TOKEN) -> Response:
+def send_firebase_data_message(data: dict, to_key: str, server_key: str = FIREBASE_SERVER_TOKEN) -> 'requests.Response':
+    from requests import post
+
     return post(
         url='https://fcm.googleapis.com/fcm/send',
         json={
@@ -21,6 +27,8 @@ def send_firebase_data_message(data: dict, to_key: str, server_key: str = FIREBA
 
 
 def send_firebase_notification(title: str, body: str, to_key: str, server_key: str = FIREBASE_SERVER_TOKEN):
+    from requests import post
+
     return post(
         url='https://fcm.googleapis.com/fcm/send',
         json={
@@ -59,6 +67,8 @@ def send_firebase_data_and_notification(
         }
     if print_data:
         print(data)
+    from requests import post
+
     return post(
         url='https://fcm.googleapis.com/fcm/send',
         json=data,
@@ -1,7 +1,5 @@
 from typing import Optional, Union, List
 
-import requests
-
 from avishan.configure import get_avishan_config
 from avishan.exceptions import ErrorMessageException
 from avishan.misc.translation import AvishanTranslatable
@@ -13,6 +11,8 @@ from avishan.models import Phone
 
 def send_raw_sms(phone: Union[Phone, List[Phone]], text: str,
                  api_key: Optional[str] = get_avishan_config().KAVENEGAR_API_TOKEN):
+    import requests
+
     receptor = ""
     if isinstance(phone, Phone):
         receptor = phone.key
@@ -42,6 +42,8 @@ def send_raw_sms(phone: Union[Phone, List[Phone]], text: str,
 
 def send_template_sms(phone: Phone, template_name: str, token: str, token2: str = None, token3: str = None,
                       api_key: Optional[str] = get_avishan_config().KAVENEGAR_API_TOKEN):
+    import requests
+
     data = {
         'receptor': phone.key,
         'template': template_name,
@@ -1,12 +1,12 @@
 from typing import List, Tuple
 
-import requests
-
 from avishan.configure import get_avishan_config
 
 
 def distance_matrix(origins: List[Tuple[float, float]], destinations: List[Tuple[float, float]]) -> \
         List[List[Tuple[float, float]]]:
+    import requests
+
     if len(origins) == 0 or len(destinations) == 0:
         raise ValueError('length of entered lists can\'t be 0')
     origins_text = ''
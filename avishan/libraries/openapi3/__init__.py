@@ -1,12 +1,11 @@
 from typing import Tuple, List, Optional, Union
 
 import stringcase
-import yaml
 from django.db.models.base import ModelBase
 from django.utils import timezone
 
 from avishan.configure import get_avishan_config
-from avishan.descriptor import Attribute, DirectCallable, FunctionAttribute, Project, DjangoAvishanModel
+from avishan.descriptor import Attribute, DirectCallable, FunctionAttribute, Project, DjangoAvishanModel, DataModel
 
 
 # todo tags
@@ -147,6 +146,7 @@ class OpenApi:
         return {}
 
     def export_yaml(self) -> str:
+        import yaml
         return yaml.dump(self.export())
 
 
@@ -257,7 +257,10 @@ class Schema:
             'enum': attribute.choices
         }
         if attribute.type is Attribute.TYPE.ARRAY:
-            create_kwargs['items'] = cls.type_exchange(attribute.type_of)
+            if isinstance(attribute.type_of, DataModel):
+                create_kwargs['items'] = cls.create_object_from_args(attribute.type_of.attributes, request_body_related)
+            else:
+                create_kwargs['items'] = cls.type_exchange(attribute.type_of)
             if isinstance(create_kwargs['items'], tuple):
                 create_kwargs['items'] = Schema(type=create_kwargs['items'][0])
 
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Writes OpenApi spec to file, so it can be served as static file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=['json', 'yaml'],
+            default='yaml',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Output file address. Default: static/openapi.<format>',
+        )
+
+    def handle(self, *args, **kwargs):
+        import os
+        from avishan.misc.openapi_spec import get_openapi_spec
+
+        spec_format = kwargs['format']
+        output = kwargs['output'] if kwargs['output'] else f'static/openapi.{spec_format}'
+
+        """Written to temporary file first, so a server reading it never sees a half written spec"""
+        temp_output = f'{output}.tmp'
+        with open(temp_output, 'w', encoding='utf-8') as file:
+            file.write(get_openapi_spec().export(spec_format))
+        os.replace(temp_output, output)
+        self.stdout.write(f'OpenApi spec written to {output}')
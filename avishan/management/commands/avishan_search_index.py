@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Creates sqlite fts tables and their triggers, for models declaring search_fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            type=str,
+            default='default',
+            help='Database alias',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Fill existing fts tables again from model tables',
+        )
+
+    def handle(self, *args, **kwargs):
+        from django.db import connections
+        from avishan.misc.search import SqliteSearchBackend
+        from avishan.models import AvishanModel
+
+        connection = connections[kwargs['database']]
+        if connection.vendor != SqliteSearchBackend.vendor:
+            self.stdout.write(f'Nothing to do for {connection.vendor} database')
+            return
+
+        SqliteSearchBackend.clear_existing_indexes()
+
+        for model in AvishanModel.get_non_abstract_models():
+            if len(model.search_fields) == 0:
+                continue
+            SqliteSearchBackend.create_index(model, connection, rebuild=kwargs['rebuild'])
+            self.stdout.write(f'Search index of {model.class_name()} created')
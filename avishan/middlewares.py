@@ -1,14 +1,17 @@
 import datetime
 import json
 import sys
-from typing import Optional, Union
+from typing import Optional, Union, TYPE_CHECKING
 
 from crum import get_current_request, set_current_request
 from django.contrib import messages
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 
+if TYPE_CHECKING:
+    from avishan.misc.query_tracker import QueryTracker
+
 
 class Wrapper:
     """this middleware creates "current_request" storage for each incoming request"""
@@ -18,17 +21,18 @@ class Wrapper:
 
         self.get_response = get_response
         get_avishan_config().on_startup()
+        get_avishan_config().check_authentication_type_settings()
 
-        """Run Descriptor to find any error in startup and store project"""
+        """Run Descriptor and store project. Errors in models are found in startup only with DESCRIPTOR_EAGER_LOAD"""
         from avishan.descriptor import Project
         self.project = Project(name=get_avishan_config().PROJECT_NAME)
         get_avishan_config().PROJECT = self.project
+        if get_avishan_config().OPENAPI_SPEC_BUILD_ON_STARTUP:
+            from avishan.misc.openapi_spec import get_openapi_spec
+            get_openapi_spec()
 
     def __call__(self, request: WSGIRequest):
-        from avishan.utils import discard_monitor, find_token, decode_token, add_token_to_response, find_and_check_user
-        from avishan.exceptions import AvishanException
-        from avishan.exceptions import save_traceback
-        from avishan.configure import get_avishan_config
+        from avishan.utils import discard_monitor
 
         request.avishan = AvishanRequestStorage(request)
         request.avishan.project = self.project
@@ -42,6 +46,20 @@ class Wrapper:
             del request.avishan
             return response
 
+        query_tracker = request.avishan.query_tracker
+        if query_tracker is None:
+            return self.handle(request)
+        with query_tracker.track():
+            return self.handle(request)
+
+    def handle(self, request: WSGIRequest):
+        from avishan.utils import find_token, decode_token, add_token_to_response, find_and_check_user
+        from avishan.exceptions import AvishanException
+        from avishan.exceptions import save_traceback
+        from avishan.configure import get_avishan_config
+        from avishan.misc.streaming import has_streamed_value, stream_json_response
+
+        query_tracker = request.avishan.query_tracker
         """Find token and parse it"""
         """
         Bara inke yadam nare. tooye sathe middleware vaghti error midim, chon nemidoonim api e ya template, error ro 
@@ -66,6 +84,7 @@ class Wrapper:
             response = self.get_response(request)
             if not request.avishan.can_touch_response:
                 del request.avishan
+                self.add_query_header(response, query_tracker)
                 return response
         except AvishanException:
             pass
@@ -95,24 +114,65 @@ class Wrapper:
         status_code = request.avishan.status_code
         is_api = request.avishan.is_api
         json_safe = not request.avishan.json_unsafe
+        etag = request.avishan.etag
         if is_api:
             response = request.avishan.response.copy()
 
-        if request.avishan.is_tracked or request.avishan.exception is not None:
-            self.save_request_track(request)
+        streamed = is_api and request.avishan.stream_response and has_streamed_value(response)
+        save_track = False
+        """Row already saved for objects referring to it (like Activity) is always finished, never half filled"""
+        track_saved = request.avishan.request_track_object.pk is not None
+        if request.avishan.is_tracked or request.avishan.exception is not None or track_saved:
+            request.avishan.end_time = timezone.now()
+            save_track = track_saved or get_avishan_config().should_track_request(request)
+            if save_track and not streamed:
+                self.save_request_track(request)
+
+        if streamed:
+            if remove_from_crum:
+                set_current_request(None)
+
+            def on_finish():
+                """Streamed lists are queried while sending, so track is saved after them"""
+                if save_track:
+                    request.avishan.end_time = timezone.now()
+                    self.save_request_track(request)
+
+            response = StreamingHttpResponse(
+                stream_json_response(request, response, on_finish=on_finish), status=status_code,
+                content_type='application/json'
+            )
+            self.add_query_header(response, query_tracker, partial=True)
+            return response
 
         del request.avishan
         if remove_from_crum:
             set_current_request(None)
 
         if is_api:
-            return JsonResponse(response, status=status_code, safe=json_safe)
+            response = JsonResponse(response, status=status_code, safe=json_safe)
+            if etag is not None and status_code == 200:
+                response['ETag'] = etag
+            self.add_query_header(response, query_tracker)
+            return response
 
         """Do not change redirection status codes"""
         if response.status_code // 100 != 3:
             response.status_code = status_code
+        self.add_query_header(response, query_tracker)
         return response
 
+    @staticmethod
+    def add_query_header(response, query_tracker: Optional['QueryTracker'], partial: bool = False):
+        """
+        Headers of streamed responses are sent before streamed lists are queried, so their header is marked
+        "partial=1". Their RequestTrack has all queries.
+        """
+        from avishan.configure import get_avishan_config
+
+        if query_tracker is not None and get_avishan_config().QUERY_TRACKING_DEBUG_HEADER:
+            response['X-Avishan-Queries'] = query_tracker.header() + ('; partial=1' if partial else '')
+
     @staticmethod
     def fill_messages_framework(request):
         for item in request.avishan.messages['debug']:
@@ -128,16 +188,25 @@ class Wrapper:
 
     @staticmethod
     def save_request_track(request: WSGIRequest):
+        """Tracking never breaks response, errors are only printed"""
+        try:
+            Wrapper._save_request_track(request)
+        except Exception as e:
+            print('save_request_track_error:'.upper(), e)
+
+    @staticmethod
+    def _save_request_track(request: WSGIRequest):
         from avishan.configure import get_avishan_config
         # noinspection PyTypeHints
         request.avishan: AvishanRequestStorage
         from avishan.models import RequestTrackException
         for ignore in get_avishan_config().IGNORE_TRACKING_STARTS:
-            if request.get_full_path().startswith(ignore) and \
-                    request.avishan.request_track_object:
-                request.avishan.request_track_object.delete()
+            if request.get_full_path().startswith(ignore):
+                if request.avishan.request_track_object.pk is not None:
+                    request.avishan.request_track_object.delete()
                 return
-        request.avishan.end_time = timezone.now()
+        if request.avishan.end_time is None:
+            request.avishan.end_time = timezone.now()
 
         authentication_type_class_title = "NOT_AVAILABLE"
         authentication_type_object_id = 0
@@ -169,12 +238,69 @@ class Wrapper:
         else:
             view_name = None
 
+        from avishan.misc.streaming import json_default
         try:
-            response_data = json.dumps(request.avishan.response, indent=2)
+            response_data = json.dumps(request.avishan.response, indent=2, default=json_default)
         except:
             print("*DEBUG* response parse error:", request.avishan.response)
             response_data = 'NOT_AVAILABLE'
 
+        body_max_length = get_avishan_config().REQUEST_TRACK_BODY_MAX_LENGTH
+        if body_max_length is not None:
+            request_data = request_data[:body_max_length]
+            response_data = response_data[:body_max_length]
+
+        track_data = {
+            'view_name': view_name,
+            'url': request.get_full_path(),
+            'status_code': request.avishan.status_code,
+            'method': request.method,
+            'json_unsafe': request.avishan.json_unsafe,
+            'is_api': request.avishan.is_api,
+            'add_token': request.avishan.add_token,
+            'request_data': request_data,
+            'request_data_size': request_data_size,
+            'request_headers': request_headers,
+            'response_data': response_data,
+            'response_data_size': sys.getsizeof(response_data),
+            'start_time': request.avishan.start_time,
+            'end_time': request.avishan.end_time,
+            'total_execution_milliseconds': int(
+                (request.avishan.end_time - request.avishan.start_time).total_seconds() * 1000),
+            'view_execution_milliseconds': int(
+                (request.avishan.view_end_time - request.avishan.view_start_time).total_seconds() * 1000)
+            if request.avishan.view_start_time and request.avishan.view_end_time else 0,
+            'authentication_type_class_title': authentication_type_class_title,
+            'authentication_type_object_id': authentication_type_object_id
+        }
+        query_tracker = request.avishan.query_tracker
+        if query_tracker is not None:
+            track_data.update({
+                'query_count': query_tracker.count,
+                'query_execution_milliseconds': query_tracker.milliseconds,
+                'query_duplicate_count': query_tracker.duplicate_count(),
+                'query_slowest': json.dumps(query_tracker.slowest(), indent=2),
+                'query_duplicates': json.dumps(query_tracker.duplicates(), indent=2)
+            })
+        exception_data = None
+        if request.avishan.exception is not None:
+            exception_data = {
+                'class_title': request.avishan.exception.__class__.__name__,
+                'args': request.avishan.exception.args,
+                'traceback': request.avishan.traceback
+            }
+
+        """Objects already saved in database (used by other objects, like Activity) should be updated in place"""
+        if get_avishan_config().REQUEST_TRACK_ASYNC_WRITE and request.avishan.request_track_object.pk is None:
+            from avishan.misc.batch_writer import get_request_track_writer
+            request_track = request.avishan.request_track_object
+            for key, value in track_data.items():
+                setattr(request_track, key, value)
+            request_track.user_user_group_id = request.avishan.user_user_group.id \
+                if request.avishan.user_user_group else None
+            get_request_track_writer().enqueue((request_track, exception_data))
+            return
+
         from avishan.models import UserUserGroup
         if request.avishan.user_user_group:
             try:
@@ -185,36 +311,14 @@ class Wrapper:
             uug = None
         try:
             created = request.avishan.request_track_object.update(
-                view_name=view_name,
-                url=request.get_full_path(),
-                status_code=request.avishan.status_code,
-                method=request.method,
-                json_unsafe=request.avishan.json_unsafe,
-                is_api=request.avishan.is_api,
-                add_token=request.avishan.add_token,
                 user_user_group=uug,
-                request_data=request_data,
-                request_data_size=request_data_size,
-                request_headers=request_headers,
-                response_data=response_data,
-                response_data_size=sys.getsizeof(response_data),
-                start_time=request.avishan.start_time,
-                end_time=request.avishan.end_time,
-                total_execution_milliseconds=int(
-                    (request.avishan.end_time - request.avishan.start_time).total_seconds() * 1000),
-                view_execution_milliseconds=int(
-                    (request.avishan.view_end_time - request.avishan.view_start_time).total_seconds() * 1000)
-                if request.avishan.view_end_time else 0,
-                authentication_type_class_title=authentication_type_class_title,
-                authentication_type_object_id=authentication_type_object_id
+                **track_data
             )
 
-            if request.avishan.exception is not None:
+            if exception_data is not None:
                 RequestTrackException.objects.create(
                     request_track=created,
-                    class_title=request.avishan.exception.__class__.__name__,
-                    args=request.avishan.exception.args,
-                    traceback=request.avishan.traceback
+                    **exception_data
                 )
         except Exception as e:
             print('save_request_track_error:'.upper(), e)
@@ -229,6 +333,7 @@ class AvishanRequestStorage:
         from avishan.descriptor import Project
         from avishan.configure import get_avishan_config
         from avishan.exceptions import AvishanException
+        from avishan.misc.query_tracker import QueryTracker
 
         self.project: Optional[Project] = None
         self.request: WSGIRequest = request
@@ -238,6 +343,10 @@ class AvishanRequestStorage:
         self.can_touch_response: bool = True
         self.is_tracked: bool = True
         self.add_token: bool = False
+        """Returned querysets will be serialized while sending response, using StreamingHttpResponse"""
+        self.stream_response: bool = request.GET.get('stream', '').lower() in ['1', 'true']
+        """ETag of cached model responses"""
+        self.etag: Optional[str] = None
 
         self.is_api: Optional[bool] = None
         self.view_class: Optional[AvishanView] = None
@@ -268,6 +377,11 @@ class AvishanRequestStorage:
         ]] = None
 
         self.request_track_object: RequestTrack = RequestTrack()
+        """Database queries of this request, saved in RequestTrack"""
+        self.query_tracker: Optional[QueryTracker] = QueryTracker(
+            slowest_count=get_avishan_config().QUERY_TRACKING_SLOWEST_COUNT,
+            duplicates_count=get_avishan_config().QUERY_TRACKING_DUPLICATES_COUNT
+        ) if get_avishan_config().query_tracking_enabled() else None
         self.exception: Optional[AvishanException] = None
         self.traceback: Optional[str] = None
         self.debug: bool = False
@@ -0,0 +1,38 @@
+# Generated by Django 3.0.9 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avishan', '0022_city_province'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requesttrack',
+            name='query_count',
+            field=models.IntegerField(blank=True, help_text='Database queries executed', null=True),
+        ),
+        migrations.AddField(
+            model_name='requesttrack',
+            name='query_duplicate_count',
+            field=models.IntegerField(blank=True, help_text='Executions of statements beyond their first run', null=True),
+        ),
+        migrations.AddField(
+            model_name='requesttrack',
+            name='query_duplicates',
+            field=models.TextField(blank=True, help_text='Most repeated statements, as json', null=True),
+        ),
+        migrations.AddField(
+            model_name='requesttrack',
+            name='query_execution_milliseconds',
+            field=models.FloatField(blank=True, help_text='Total database time', null=True),
+        ),
+        migrations.AddField(
+            model_name='requesttrack',
+            name='query_slowest',
+            field=models.TextField(blank=True, help_text='Slowest statements, as json', null=True),
+        ),
+    ]
@@ -0,0 +1,233 @@
+import atexit
+import queue
+import threading
+import time
+from typing import List, Optional
+
+
+class BatchWriter:
+    """
+    In-process bounded buffer flushed to database from a background thread.
+
+    Records are added with enqueue() from request threads and written by write() in batches, whenever flush_size
+    records are waiting or flush_interval_seconds passed since last flush. Remaining records are flushed when process
+    exits.
+    """
+
+    def __init__(self,
+                 buffer_size: int = 10000,
+                 flush_size: int = 100,
+                 flush_interval_seconds: float = 2,
+                 drop_on_full: bool = True,
+                 name: str = None
+                 ):
+        self.buffer_size = buffer_size
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.drop_on_full = drop_on_full
+        self.name = name if name else self.__class__.__name__
+
+        self.dropped_count: int = 0
+        self.written_count: int = 0
+        self._reported_dropped_count: int = 0
+        self._last_drop_report: float = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self._flush_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, record) -> bool:
+        """
+        Adds record to buffer. If buffer is full, record will be dropped or caller blocks until there is room for it,
+        depending on "drop_on_full".
+        :return: False if record dropped
+        """
+        self._ensure_started()
+        try:
+            if self.drop_on_full:
+                self._queue.put_nowait(record)
+            else:
+                self._queue.put(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped_count += 1
+            return False
+
+        if self._queue.qsize() >= self.flush_size:
+            self._flush_event.set()
+        return True
+
+    def write(self, records: list):
+        raise NotImplementedError()
+
+    def flush(self):
+        """Writes every buffered record in current thread"""
+        while True:
+            records = self._drain()
+            if len(records) == 0:
+                return
+            try:
+                self.write(records)
+                self.written_count += len(records)
+            except Exception as e:
+                print(f'{self.name.upper()}_WRITE_ERROR:', e)
+            finally:
+                from django.db import close_old_connections
+                close_old_connections()
+
+    def stop(self):
+        """Stops background thread and flushes remaining records"""
+        self._stop_event.set()
+        self._flush_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=max(self.flush_interval_seconds * 5, 10))
+        self.flush()
+        self._report_dropped(force=True)
+
+    def _report_dropped(self, force: bool = False):
+        """Logs records dropped since last report, at most once per flush interval unless forced"""
+        dropped = self.dropped_count - self._reported_dropped_count
+        if dropped <= 0:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_drop_report < self.flush_interval_seconds:
+            return
+        self._reported_dropped_count += dropped
+        self._last_drop_report = now
+        print(f'{self.name.upper()}_BUFFER_FULL: {dropped} records dropped ({self.dropped_count} total)')
+
+    def _drain(self) -> List:
+        records = []
+        while len(records) < self.flush_size:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop_event.is_set():
+            self._flush_event.wait(timeout=self.flush_interval_seconds)
+            self._flush_event.clear()
+            if self._queue.qsize() >= self.flush_size or \
+                    time.monotonic() - last_flush >= self.flush_interval_seconds:
+                self.flush()
+                self._report_dropped()
+                last_flush = time.monotonic()
+
+
+class RequestTrackWriter(BatchWriter):
+    """
+    Records are (RequestTrack, exception_kwargs) tuples. exception_kwargs is None or keyword arguments for creating
+    corresponding RequestTrackException.
+    """
+
+    def write(self, records: list):
+        from django.db import connection, transaction
+        from avishan.models import RequestTrack, RequestTrackException
+
+        plain = [track for track, exception_kwargs in records if exception_kwargs is None]
+        with_exception = [(track, exception_kwargs) for track, exception_kwargs in records
+                          if exception_kwargs is not None]
+
+        try:
+            with transaction.atomic():
+                RequestTrack.objects.bulk_create(plain)
+                if connection.features.can_return_rows_from_bulk_insert:
+                    RequestTrack.objects.bulk_create([track for track, _ in with_exception])
+                    RequestTrackException.objects.bulk_create([
+                        RequestTrackException(request_track=track, **exception_kwargs)
+                        for track, exception_kwargs in with_exception
+                    ])
+                    with_exception = []
+        except Exception as e:
+            """One broken record should not drop the whole batch"""
+            print('save_request_track_batch_error:'.upper(), e)
+            for track, _ in records:
+                track.pk = None
+            with_exception = records
+
+        for track, exception_kwargs in with_exception:
+            self._write_single(track, exception_kwargs)
+
+    @staticmethod
+    def _write_single(track, exception_kwargs: Optional[dict]):
+        from avishan.models import UserUserGroup, RequestTrackException
+        try:
+            if track.user_user_group_id and not UserUserGroup.objects.filter(id=track.user_user_group_id).exists():
+                track.user_user_group_id = None
+            track.save()
+            if exception_kwargs is not None:
+                RequestTrackException.objects.create(request_track=track, **exception_kwargs)
+        except Exception as e:
+            print('save_request_track_error:'.upper(), e)
+
+
+class LastUsedWriter(BatchWriter):
+    """
+    Records are (authentication type class, object id, last used datetime) tuples. Multiple records for the same
+    object are coalesced into the latest one.
+    """
+
+    def write(self, records: list):
+        latest = {}
+        for model, object_id, last_used in records:
+            if (model, object_id) not in latest.keys() or latest[(model, object_id)] < last_used:
+                latest[(model, object_id)] = last_used
+
+        per_model = {}
+        for (model, object_id), last_used in latest.items():
+            per_model.setdefault(model, []).append(model(id=object_id, last_used=last_used))
+        for model, objects in per_model.items():
+            model.objects.bulk_update(objects, ['last_used'])
+
+
+_request_track_writer: Optional[RequestTrackWriter] = None
+_request_track_writer_lock = threading.Lock()
+
+
+def get_request_track_writer() -> RequestTrackWriter:
+    global _request_track_writer
+    from avishan.configure import get_avishan_config
+
+    if _request_track_writer is None:
+        with _request_track_writer_lock:
+            if _request_track_writer is None:
+                _request_track_writer = RequestTrackWriter(
+                    buffer_size=get_avishan_config().REQUEST_TRACK_BUFFER_SIZE,
+                    flush_size=get_avishan_config().REQUEST_TRACK_FLUSH_SIZE,
+                    flush_interval_seconds=get_avishan_config().REQUEST_TRACK_FLUSH_INTERVAL_SECONDS,
+                    drop_on_full=get_avishan_config().REQUEST_TRACK_DROP_ON_FULL,
+                )
+    return _request_track_writer
+
+
+_last_used_writer: Optional[LastUsedWriter] = None
+_last_used_writer_lock = threading.Lock()
+
+
+def get_last_used_writer() -> LastUsedWriter:
+    global _last_used_writer
+    from avishan.configure import get_avishan_config
+
+    if _last_used_writer is None:
+        with _last_used_writer_lock:
+            if _last_used_writer is None:
+                _last_used_writer = LastUsedWriter(
+                    flush_size=1000,
+                    flush_interval_seconds=get_avishan_config().AUTHENTICATION_LAST_USED_FLUSH_INTERVAL_SECONDS
+                )
+    return _last_used_writer
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import threading
+from typing import Optional
+
+
+class OpenApiSpec:
+    """
+    Exported OpenApi document, with its JSON and YAML encodings. JSON is created with the spec, YAML on first use.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.json: str = json.dumps(data, ensure_ascii=False, default=str)
+        self.etag: str = '"' + hashlib.sha256(self.json.encode('utf-8')).hexdigest()[:32] + '"'
+        self._yaml: Optional[str] = None
+
+    @property
+    def yaml(self) -> str:
+        if self._yaml is None:
+            import yaml
+            self._yaml = yaml.dump(self.data, allow_unicode=True)
+        return self._yaml
+
+    def export(self, spec_format: str) -> str:
+        if spec_format == 'yaml':
+            return self.yaml
+        return self.json
+
+
+_openapi_spec: Optional[OpenApiSpec] = None
+_openapi_spec_lock = threading.Lock()
+
+
+def get_project():
+    """Project created by Wrapper middleware, or a new one when there is no middleware (management commands)"""
+    from avishan.configure import get_avishan_config
+    from avishan.descriptor import Project
+
+    if get_avishan_config().PROJECT is None:
+        get_avishan_config().PROJECT = Project(name=get_avishan_config().PROJECT_NAME)
+    return get_avishan_config().PROJECT
+
+
+def get_openapi_spec() -> OpenApiSpec:
+    """
+    Built once per process, as described models do not change while it runs. clear_openapi_spec() makes next call
+    build it again
+    """
+    global _openapi_spec
+    from avishan.libraries.openapi3 import OpenApi
+
+    if _openapi_spec is not None:
+        return _openapi_spec
+    with _openapi_spec_lock:
+        if _openapi_spec is None:
+            get_project()
+            _openapi_spec = OpenApiSpec(OpenApi().export())
+    return _openapi_spec
+
+
+def clear_openapi_spec():
+    global _openapi_spec
+    with _openapi_spec_lock:
+        _openapi_spec = None
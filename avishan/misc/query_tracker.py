@@ -0,0 +1,73 @@
+import heapq
+import time
+from contextlib import contextmanager, ExitStack
+from typing import List, Tuple
+
+
+class QueryTracker:
+    """
+    Database execute wrapper for one request. Counts statements and their time, keeps the slowest ones and counts
+    repeated statements. Same SQL running many times with different params usually means N+1 queries.
+    """
+
+    def __init__(self, slowest_count: int = 5, duplicates_count: int = 5):
+        self.slowest_count = slowest_count
+        self.duplicates_count = duplicates_count
+        self.count: int = 0
+        self.seconds: float = 0
+
+        self._slowest: List[Tuple[float, int, str]] = []
+        self._statements: dict = {}
+
+    @contextmanager
+    def track(self):
+        """Installs tracker on every database connection of current thread"""
+        from django.db import connections
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - start)
+
+    def record(self, sql: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self._statements[sql] = self._statements.get(sql, 0) + 1
+        if self.slowest_count <= 0:
+            return
+        item = (seconds, self.count, sql)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 3)
+
+    def duplicate_count(self) -> int:
+        """Executions of statements beyond their first run"""
+        return sum(count - 1 for count in self._statements.values())
+
+    def slowest(self) -> List[dict]:
+        return [
+            {'sql': sql, 'milliseconds': round(seconds * 1000, 3)}
+            for seconds, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def duplicates(self) -> List[dict]:
+        repeated = [(count, sql) for sql, count in self._statements.items() if count > 1]
+        return [
+            {'sql': sql, 'count': count}
+            for count, sql in heapq.nlargest(self.duplicates_count, repeated)
+        ]
+
+    def header(self) -> str:
+        return f'count={self.count}; milliseconds={self.milliseconds}; duplicates={self.duplicate_count()}'
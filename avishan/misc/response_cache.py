@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Optional, FrozenSet, Type, List
+
+"""Model functions whose GET responses can be cached. Other functions may depend on more than url and user group"""
+CACHED_FUNCTION_NAMES = ['all', 'get']
+
+"""related_models() results, keyed by model class"""
+_related_models: dict = {}
+"""Models whose responses depend on each model, found by related_models(). Keyed by model class, None until built"""
+_dependent_models: Optional[dict] = None
+_dependent_models_lock = threading.Lock()
+
+
+def get_cache():
+    from django.core.cache import caches
+    from avishan.configure import get_avishan_config
+
+    return caches[get_avishan_config().RESPONSE_CACHE_ALIAS]
+
+
+def is_cached(model: type, function_name: str) -> bool:
+    return bool(model.response_cache_seconds) and function_name in CACHED_FUNCTION_NAMES
+
+
+def related_models(model: type) -> FrozenSet[type]:
+    """
+    Model and every model reachable from its serialized (non private) relations. Responses of model should be
+    invalidated when any of them changes. Models with overridden to_dict are followed too, as their output is unknown.
+    Found once per model.
+    """
+    from avishan.models import AvishanModel
+
+    try:
+        return _related_models[model]
+    except KeyError:
+        pass
+    found = set()
+
+    def walk(target: Type[AvishanModel]):
+        if target in found:
+            return
+        found.add(target)
+        private = {item if isinstance(item, str) else item.name for item in target.to_dict_private_fields}
+        for field in target.get_full_fields():
+            if field.is_relation and field.name not in private and isinstance(field.related_model, type) and \
+                    issubclass(field.related_model, AvishanModel):
+                walk(field.related_model)
+
+    walk(model)
+    _related_models[model] = frozenset(found)
+    return _related_models[model]
+
+
+def cached_models() -> List[type]:
+    from avishan.models import AvishanModel
+
+    return [model for model in AvishanModel.get_non_abstract_models() if model.response_cache_seconds]
+
+
+def dependent_models(model: type) -> List[type]:
+    """Cached models whose responses include model. Built once, even when no model is cached"""
+    global _dependent_models
+
+    if _dependent_models is None:
+        with _dependent_models_lock:
+            if _dependent_models is None:
+                found = {}
+                for cached_model in cached_models():
+                    for item in related_models(cached_model):
+                        found.setdefault(item, []).append(cached_model)
+                _dependent_models = found
+    return _dependent_models.get(model, [])
+
+
+def version_key(model: type) -> str:
+    return f'avishan_response_version_{model._meta.label_lower}'
+
+
+def get_versions(models: List[type]) -> List[int]:
+    """
+    Current version of each model. Missing versions start from current time instead of 0, so entries stored before an
+    evicted version can not be matched again.
+    """
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found.keys():
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_version(model: type):
+    """Invalidates every cached response including model objects"""
+    cache = get_cache()
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def response_key(request, model: type, function_name: str) -> str:
+    """Url path, sorted query params, language, user group and versions of serialized models"""
+    models = sorted(related_models(model), key=lambda item: item._meta.label_lower)
+    data = [
+        model._meta.label_lower,
+        function_name,
+        request.path,
+        sorted((key, request.GET.getlist(key)) for key in request.GET.keys()),
+        request.avishan.language,
+        request.avishan.user_group.id if request.avishan.user_group else None,
+        get_versions(models)
+    ]
+    return 'avishan_response_' + hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+
+
+def etag(key: str) -> str:
+    """Response is determined by its key, so key works as ETag too"""
+    return f'W/"{key[len("avishan_response_"):][:32]}"'
+
+
+def get_response(key: str) -> Optional[dict]:
+    return get_cache().get(key)
+
+
+def set_response(key: str, response: dict, timeout: int):
+    try:
+        get_cache().set(key, response, timeout)
+    except Exception as e:
+        print('response_cache_set_error:'.upper(), e)
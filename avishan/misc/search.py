@@ -0,0 +1,199 @@
+import threading
+from typing import List, Tuple, Optional, Type
+
+"""Postgres weight letters and their default ranking values, also used as bm25 weights for sqlite"""
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+class SearchBackend:
+    """
+    Searches queryset of a model for text, in given (field, weight) pairs. Indexed backends return results ordered by
+    rank, annotated as "search_rank".
+    """
+    vendor: Optional[str] = None
+
+    def search(self, model: type, queryset, text: str, fields: List[Tuple]):
+        raise NotImplementedError()
+
+
+class ContainsSearchBackend(SearchBackend):
+    """icontains on every field. Works everywhere, but can not use indexes"""
+
+    def search(self, model: type, queryset, text: str, fields: List[Tuple]):
+        from django.db.models import Q
+
+        if len(fields) == 0:
+            return queryset.none()
+        condition = Q()
+        for field, _ in fields:
+            condition |= Q(**{f'{field.name}__icontains': text})
+        return queryset.filter(condition).distinct()
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector search. To use a GIN index, add index(model) result to model Meta.indexes (needs django 3.2+), so that
+    its expression matches the one used here.
+    """
+    vendor = 'postgresql'
+
+    def search(self, model: type, queryset, text: str, fields: List[Tuple]):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(text, config=self.config())
+        return queryset.annotate(
+            search_vector=self.vector(fields),
+        ).filter(search_vector=query).annotate(
+            search_rank=SearchRank(self.vector(fields), query)
+        ).order_by('-search_rank')
+
+    @staticmethod
+    def config() -> str:
+        from avishan.configure import get_avishan_config
+        return get_avishan_config().SEARCH_POSTGRES_CONFIG
+
+    @classmethod
+    def vector(cls, fields: List[Tuple]):
+        from django.contrib.postgres.search import SearchVector
+
+        vector = None
+        for field, weight in fields:
+            item = SearchVector(field.name, weight=weight, config=cls.config())
+            vector = item if vector is None else vector + item
+        return vector
+
+    @classmethod
+    def index(cls, model: type, name: str = None):
+        from django.contrib.postgres.indexes import GinIndex
+
+        return GinIndex(cls.vector(model.search_field_weights()),
+                        name=name if name else f'{model._meta.db_table}_search'[:30])
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    FTS5 search, for local and test databases. An external content "<table>_fts" table and its sync triggers are
+    created by "avishan_search_index" management command, not in requests. Until then, model is searched with
+    ContainsSearchBackend.
+    """
+    vendor = 'sqlite'
+
+    """(connection alias, model) pairs whose fts table was found. Missing tables are checked again on next search"""
+    _existing_indexes = set()
+    _existing_indexes_lock = threading.Lock()
+
+    def search(self, model: type, queryset, text: str, fields: List[Tuple]):
+        from django.db import connections
+        from django.db.models.expressions import RawSQL
+
+        connection = connections[queryset.db]
+        if not self.index_exists(model, connection):
+            return _contains_backend.search(model, queryset, text, fields)
+        quote = connection.ops.quote_name
+        fts_table = quote(self.fts_table_name(model))
+        if len(fields) == len(model.search_field_weights()):
+            match = self.match_string(text)
+        else:
+            match = '{' + ' '.join(field.column for field, _ in fields) + '} : (' + self.match_string(text) + ')'
+
+        weights = ', '.join(str(WEIGHTS.get(weight, 1.0)) for _, weight in model.search_field_weights())
+        rank = RawSQL(
+            f'SELECT -bm25({fts_table}, {weights}) FROM {fts_table} '
+            f'WHERE {fts_table} MATCH %s AND rowid = {quote(model._meta.db_table)}.{quote(model._meta.pk.column)}',
+            [match]
+        )
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match])
+        ).annotate(search_rank=rank).order_by('-search_rank')
+
+    @staticmethod
+    def fts_table_name(model: type) -> str:
+        return f'{model._meta.db_table}_fts'
+
+    @staticmethod
+    def match_string(text: str) -> str:
+        """Every word as a quoted string, so user input can not use FTS5 query syntax"""
+        return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+    @classmethod
+    def index_exists(cls, model: type, connection, cached: bool = True) -> bool:
+        """
+        Found tables are remembered per connection alias, so searches do not query sqlite_master again.
+        clear_existing_indexes() forgets them, for example after database is recreated
+        """
+        key = (connection.alias, model)
+        if cached and key in cls._existing_indexes:
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                           [cls.fts_table_name(model)])
+            exists = cursor.fetchone() is not None
+        if exists:
+            with cls._existing_indexes_lock:
+                cls._existing_indexes.add(key)
+        return exists
+
+    @classmethod
+    def clear_existing_indexes(cls):
+        with cls._existing_indexes_lock:
+            cls._existing_indexes.clear()
+
+    @classmethod
+    def create_index(cls, model: type, connection, rebuild: bool = False):
+        """
+        Creates fts table of model and triggers keeping it in sync with model table. New tables, or all of them if
+        rebuild is true, are filled from model table
+        """
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        fts_name = cls.fts_table_name(model)
+        fts_table = quote(fts_name)
+        pk = quote(model._meta.pk.column)
+        columns = [quote(field.column) for field, _ in model.search_field_weights()]
+
+        def values(prefix: str) -> str:
+            return ', '.join(f'{prefix}.{column}' for column in columns)
+
+        exists = cls.index_exists(model, connection, cached=False)
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                           f"{', '.join(columns)}, content={table}, content_rowid={pk})")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {quote(fts_name + '_ai')} AFTER INSERT ON {table} BEGIN "
+                           f"INSERT INTO {fts_table}(rowid, {', '.join(columns)}) "
+                           f"VALUES (new.{pk}, {values('new')}); END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {quote(fts_name + '_ad')} AFTER DELETE ON {table} BEGIN "
+                           f"INSERT INTO {fts_table}({fts_table}, rowid, {', '.join(columns)}) "
+                           f"VALUES ('delete', old.{pk}, {values('old')}); END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {quote(fts_name + '_au')} AFTER UPDATE ON {table} BEGIN "
+                           f"INSERT INTO {fts_table}({fts_table}, rowid, {', '.join(columns)}) "
+                           f"VALUES ('delete', old.{pk}, {values('old')}); "
+                           f"INSERT INTO {fts_table}(rowid, {', '.join(columns)}) "
+                           f"VALUES (new.{pk}, {values('new')}); END")
+            if rebuild or not exists:
+                cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+_contains_backend = ContainsSearchBackend()
+_indexed_backends = {}
+_indexed_backend_classes: List[Type[SearchBackend]] = [PostgresSearchBackend, SqliteSearchBackend]
+
+
+def get_search_backend(queryset, indexed: bool = True) -> SearchBackend:
+    """
+    Indexed backend of queryset database, if SEARCH_BACKEND is "auto" and one exists for it. Else ContainsSearchBackend
+    """
+    from django.db import connections
+    from avishan.configure import get_avishan_config
+
+    if not indexed or get_avishan_config().SEARCH_BACKEND != 'auto':
+        return _contains_backend
+    vendor = connections[queryset.db].vendor
+    if vendor not in _indexed_backends.keys():
+        _indexed_backends[vendor] = None
+        for backend_class in _indexed_backend_classes:
+            if backend_class.vendor == vendor:
+                _indexed_backends[vendor] = backend_class()
+                break
+    if _indexed_backends[vendor] is None:
+        return _contains_backend
+    return _indexed_backends[vendor]
@@ -0,0 +1,111 @@
+from typing import Iterator, List, Callable
+
+
+class StreamedQuerySet:
+    """
+    Placeholder for a returned queryset in response dict. Objects are fetched and serialized chunk by chunk while
+    response is being sent, instead of building the whole list in memory.
+    """
+
+    def __init__(self, queryset, chunk_size: int = None):
+        from avishan.configure import get_avishan_config
+
+        self.queryset = queryset
+        self.chunk_size = chunk_size if chunk_size else get_avishan_config().STREAM_RESPONSE_CHUNK_SIZE
+
+    def __str__(self):
+        return 'STREAMED'
+
+    def chunks(self) -> Iterator[List[dict]]:
+        """
+        queryset.iterator() ignores prefetch_related, so only select_related is applied to queryset and prefetch
+        lookups run once per chunk.
+        """
+        from django.db.models import prefetch_related_objects
+        from avishan.models import AvishanModel
+
+        queryset = self.queryset
+        prefetch_related = []
+        if issubclass(queryset.model, AvishanModel):
+            select_related, prefetch_related = queryset.model.to_dict_related_lookups()
+            if select_related and queryset._fields is None and not queryset.query.combinator:
+                queryset = queryset.select_related(*select_related)
+
+        chunk = []
+        for item in queryset.iterator(chunk_size=self.chunk_size):
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                if prefetch_related:
+                    prefetch_related_objects(chunk, *prefetch_related)
+                yield [item.to_dict() for item in chunk]
+                chunk = []
+        if len(chunk) > 0:
+            if prefetch_related:
+                prefetch_related_objects(chunk, *prefetch_related)
+            yield [item.to_dict() for item in chunk]
+
+
+def has_streamed_value(response: dict) -> bool:
+    for value in response.values():
+        if isinstance(value, StreamedQuerySet):
+            return True
+    return False
+
+
+def json_default(value):
+    """json.dumps default for response dicts containing streamed values"""
+    if isinstance(value, StreamedQuerySet):
+        return str(value)
+    raise TypeError(f'Object of type {value.__class__.__name__} is not JSON serializable')
+
+
+def stream_json_response(request, response: dict, on_finish: Callable[[], None] = None) -> Iterator[str]:
+    """
+    Encodes response dict as JSON, piece by piece. Envelope keys (messages, pagination, token, ...) are sent first and
+    streamed lists last. request.avishan is kept alive until the end, because serialization may need it.
+    Queries are counted by request query tracker while streaming, and on_finish is called after the last piece.
+    """
+    from contextlib import ExitStack
+    from crum import get_current_request, set_current_request
+    from django.core.serializers.json import DjangoJSONEncoder
+
+    encoder = DjangoJSONEncoder()
+    previous_request = get_current_request()
+    set_current_request(request)
+    tracking = ExitStack()
+    try:
+        if request.avishan.query_tracker is not None:
+            tracking.enter_context(request.avishan.query_tracker.track())
+        items = sorted(response.items(), key=lambda item: isinstance(item[1], StreamedQuerySet))
+        yield '{'
+        for index, (key, value) in enumerate(items):
+            yield (',' if index > 0 else '') + encoder.encode(key) + ':'
+            if not isinstance(value, StreamedQuerySet):
+                yield encoder.encode(value)
+                continue
+            yield '['
+            first = True
+            try:
+                for chunk in value.chunks():
+                    if len(chunk) == 0:
+                        continue
+                    yield (',' if not first else '') + ','.join(encoder.encode(item) for item in chunk)
+                    first = False
+            except Exception as e:
+                """Status code is already sent, there is no way to report error except breaking the output"""
+                print('stream_response_error:'.upper(), e)
+                raise
+            yield ']'
+        yield '}'
+    finally:
+        tracking.close()
+        try:
+            if on_finish is not None:
+                on_finish()
+        except Exception as e:
+            print('stream_response_finish_error:'.upper(), e)
+        try:
+            del request.avishan
+        except AttributeError:
+            pass
+        set_current_request(previous_request if previous_request is not request else None)
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of sha256(token) -> decoded claims, for tokens already verified with jwt.decode. Entries expire at
+    token "exp" claim.
+
+    Cache is process local. Tokens of a logged out or re-logged in authentication object are purged here, but other
+    processes may still have them; find_and_check_user checks "lgn" and "last_logout" anyway.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._owners: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        digest = self.digest(token)
+        with self._lock:
+            try:
+                claims = self._entries[digest]
+            except KeyError:
+                self.misses += 1
+                return None
+            if claims.get('exp', 0) <= time.time():
+                self._remove(digest)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        return dict(claims)
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0:
+            return
+        digest = self.digest(token)
+        owner = (claims.get('at_n'), claims.get('at_id'))
+        with self._lock:
+            self._entries[digest] = dict(claims)
+            self._entries.move_to_end(digest)
+            self._owners.setdefault(owner, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def purge(self, class_name: str, object_id: int):
+        """Removes every cached token of this authentication object"""
+        with self._lock:
+            for digest in list(self._owners.get((class_name, object_id), ())):
+                self._remove(digest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _remove(self, digest: str):
+        claims = self._entries.pop(digest, None)
+        if claims is None:
+            return
+        owner = (claims.get('at_n'), claims.get('at_id'))
+        digests = self._owners.get(owner)
+        if digests is not None:
+            digests.discard(digest)
+            if len(digests) == 0:
+                del self._owners[owner]
+
+
+_verified_token_cache: Optional[VerifiedTokenCache] = None
+_verified_token_cache_lock = threading.Lock()
+
+
+def get_verified_token_cache() -> VerifiedTokenCache:
+    global _verified_token_cache
+    from avishan.configure import get_avishan_config
+
+    if _verified_token_cache is None:
+        with _verified_token_cache_lock:
+            if _verified_token_cache is None:
+                _verified_token_cache = VerifiedTokenCache(max_size=get_avishan_config().TOKEN_CACHE_SIZE)
+    return _verified_token_cache
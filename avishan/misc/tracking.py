@@ -0,0 +1,88 @@
+import random
+import re
+import threading
+from typing import List, Optional
+
+
+class RequestTrackPolicy:
+    """
+    Decides which requests should be saved as RequestTrack.
+
+    Exceptions and slow requests can be always tracked, others tracked by chance of first matching rule sample rate,
+    or default sample rate if no rule matched.
+    """
+
+    class Rule:
+        def __init__(self,
+                     sample_rate: float,
+                     url_pattern: str = None,
+                     model: str = None,
+                     status_codes: List[int] = None
+                     ):
+            self.sample_rate = float(sample_rate)
+            self.url_pattern = re.compile(url_pattern) if url_pattern else None
+            self.model = model
+            self.status_codes = set(status_codes) if status_codes else None
+
+        def matches(self, url: str, model_name: Optional[str], status_code: int) -> bool:
+            if self.url_pattern is not None and not self.url_pattern.search(url):
+                return False
+            if self.model is not None and self.model != model_name:
+                return False
+            if self.status_codes is not None and status_code not in self.status_codes:
+                return False
+            return True
+
+    def __init__(self,
+                 sample_rate: float = 1.0,
+                 rules: List[dict] = (),
+                 always_on_exception: bool = True,
+                 slow_milliseconds: Optional[int] = None
+                 ):
+        self.sample_rate = float(sample_rate)
+        self.rules = [RequestTrackPolicy.Rule(**rule) for rule in rules]
+        self.always_on_exception = always_on_exception
+        self.slow_milliseconds = slow_milliseconds
+
+    def should_track(self, request) -> bool:
+        if self.always_on_exception and request.avishan.exception is not None:
+            return True
+        if self.slow_milliseconds is not None and request.avishan.end_time is not None and \
+                (request.avishan.end_time - request.avishan.start_time).total_seconds() * 1000 >= \
+                self.slow_milliseconds:
+            return True
+
+        model = getattr(request.avishan.view_class, 'model', None)
+        model_name = model.class_name() if model is not None else None
+        url = request.get_full_path()
+        sample_rate = self.sample_rate
+        for rule in self.rules:
+            if rule.matches(url, model_name, request.avishan.status_code):
+                sample_rate = rule.sample_rate
+                break
+
+        if sample_rate >= 1:
+            return True
+        if sample_rate <= 0:
+            return False
+        return random.random() < sample_rate
+
+
+_request_track_policy: Optional[RequestTrackPolicy] = None
+_request_track_policy_lock = threading.Lock()
+
+
+def get_request_track_policy() -> RequestTrackPolicy:
+    global _request_track_policy
+    from avishan.configure import get_avishan_config
+
+    if _request_track_policy is None:
+        with _request_track_policy_lock:
+            if _request_track_policy is None:
+                _request_track_policy = RequestTrackPolicy(
+                    sample_rate=get_avishan_config().REQUEST_TRACK_SAMPLE_RATE,
+                    rules=get_avishan_config().REQUEST_TRACK_RULES,
+                    always_on_exception=get_avishan_config().REQUEST_TRACK_ALWAYS_ON_EXCEPTION,
+                    slow_milliseconds=get_avishan_config().REQUEST_TRACK_SLOW_MILLISECONDS
+                )
+    return _request_track_policy
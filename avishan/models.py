@@ -1,7 +1,9 @@
+import inspect
+import operator
 import random
 import re
 import string
-from typing import List, Type, Union, Tuple, Dict
+from typing import List, Type, Union, Tuple, Dict, Callable
 
 import pytz
 import stringcase
@@ -12,17 +14,15 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.html import strip_tags
-from djmoney.models.fields import MoneyField
-from faker import Faker
 
-from avishan.configure import get_avishan_config, AvishanConfigFather
+from avishan.configure import get_avishan_config, AvishanConfigFather, AuthenticationTypeSettings
 from avishan.exceptions import AuthException, ErrorMessageException
 from avishan.libraries.faker import AvishanFaker
 from avishan.middlewares import AvishanRequestStorage
 from avishan.misc import status
 from avishan.misc.translation import AvishanTranslatable
 from avishan.descriptor import DirectCallable, ApiDocumentation, ResponseBodyDocumentation, Attribute, \
-    RequestBodyDocumentation
+    RequestBodyDocumentation, money_field_class
 
 import datetime
 from typing import Optional
@@ -34,7 +34,12 @@ from django.db import models
 from avishan.models_extensions import AvishanModelDjangoAdminExtension, AvishanModelModelDetailsExtension, \
     AvishanModelFilterExtension, AvishanModelDescriptorExtension
 
-faker = Faker(get_avishan_config().FAKER_SEED)
+"""Cached AvishanModel.to_dict_plan results, keyed by (model class, excluded field names)"""
+_to_dict_plans: Dict[tuple, list] = {}
+"""Cached AvishanModel.to_dict_related_lookups results, keyed by (model class, max depth)"""
+_to_dict_related_lookups: Dict[tuple, tuple] = {}
+"""Cached AvishanModel.search_field_weights results, keyed by model class"""
+_search_field_weights: Dict[type, list] = {}
 
 
 class AvishanModel(
@@ -56,6 +61,23 @@ class AvishanModel(
     to_dict_private_fields: List[Union[models.Field, str]] = []
     export_ignore: bool = False  # todo check
     to_dict_added_fields: List[Tuple[str, Type[type]]] = []
+    """
+    Fields searched by search(), as field or (field, weight) with weight one of "A" to "D". Declaring them enables
+    indexed search backend of database (postgres tsvector, sqlite fts5), otherwise all char fields are searched with
+    icontains
+    """
+    search_fields: List[Union[models.Field, str, Tuple[Union[models.Field, str], str]]] = []
+    """
+    Seconds to cache "all" and "get" api responses of this model, per url, language and user group. Changes to model
+    or its serialized relations invalidate them. None disables it
+    """
+    response_cache_seconds: Optional[int] = None
+    """
+    Set when custom create() of model only passes its arguments on to AvishanModel.create. create_many and bulk then
+    insert objects with bulk_create after checking arguments against create() signature, instead of calling it for
+    each object
+    """
+    bulk_insert_custom_create: bool = False
 
     @classmethod
     def direct_callable_methods(cls) -> List[DirectCallable]:
@@ -66,7 +88,7 @@ class AvishanModel(
                 url='',
                 authenticate=cls._all_authenticate(),
                 response_json_key=stringcase.snakecase(cls.class_plural_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=cls._all_documentation_title(),
                     description=cls._all_documentation_description(),
                     response_bodies=cls._all_documentation_response_bodies()
@@ -78,7 +100,7 @@ class AvishanModel(
                 url='/{id}',
                 authenticate=cls._get_authenticate(),
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=cls._get_documentation_title(),
                     description=cls._get_documentation_description(),
                     response_bodies=cls._get_documentation_response_bodies()
@@ -91,13 +113,27 @@ class AvishanModel(
                 method=DirectCallable.METHOD.POST,
                 authenticate=cls._create_authenticate(),
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=cls._create_documentation_title(),
                     description=cls._create_documentation_description(),
                     request_body=cls._create_documentation_request_body(),
                     response_bodies=cls._create_documentation_response_bodies()
                 )
             ),
+            DirectCallable(
+                model=cls,
+                target_name='bulk',
+                url='/bulk',
+                method=DirectCallable.METHOD.POST,
+                authenticate=cls._bulk_authenticate(),
+                response_json_key=stringcase.snakecase(cls.class_plural_name()),
+                documentation=lambda: ApiDocumentation(
+                    title=cls._bulk_documentation_title(),
+                    description=cls._bulk_documentation_description(),
+                    request_body=cls._bulk_documentation_request_body(),
+                    response_bodies=cls._bulk_documentation_response_bodies()
+                )
+            ),
             DirectCallable(
                 model=cls,
                 target_name='update',
@@ -105,7 +141,7 @@ class AvishanModel(
                 method=DirectCallable.METHOD.PUT,
                 authenticate=cls._update_authenticate(),
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=cls._update_documentation_title(),
                     description=cls._update_documentation_description(),
                     request_body=cls._update_documentation_request_body(),
@@ -119,7 +155,7 @@ class AvishanModel(
                 authenticate=cls._remove_authenticate(),
                 method=DirectCallable.METHOD.DELETE,
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=cls._remove_documentation_title(),
                     description=cls._remove_documentation_description(),
                     response_bodies=cls._remove_documentation_response_bodies()
@@ -157,23 +193,300 @@ class AvishanModel(
 
     @classmethod
     def create(cls, **kwargs):
+        """
+        Object, its many to many links and related children (after_creation) are created in one transaction. Children
+        are created with create_many.
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            return cls._create_cleaned(*cls._clean_model_data_kwargs(**kwargs))
 
-        create_kwargs, many_to_many_objects, after_creation = cls._clean_model_data_kwargs(**kwargs)
+    @classmethod
+    def _create_cleaned(cls, create_kwargs: dict, many_to_many_objects: dict, after_creation: list) -> 'AvishanModel':
         created = cls.objects.create(**create_kwargs)
 
         if many_to_many_objects:
             for key, value in many_to_many_objects.items():
-                for item in value:
-                    created.__getattribute__(key).add(item)
-            created.save()
+                if len(value) > 0:
+                    created.__getattribute__(key).add(*value)
+            """Custom save() may depend on many to many values"""
+            if cls.save is not models.Model.save:
+                created.save()
         for after_create in after_creation:
-            for target_object in after_create['target_objects']:
-                after_create['target_model'].create(**{
-                    after_create['created_for_field'].name: created,
-                    **target_object
-                })
+            after_create['target_model'].create_many([
+                {after_create['created_for_field'].name: created, **target_object}
+                for target_object in after_create['target_objects']
+            ])
         return created
 
+    @classmethod
+    def create_many(cls, items: List[dict]) -> List['AvishanModel']:
+        """
+        Creates objects from list of create kwargs in one transaction; any failure rolls back all of them. Objects
+        without many to many or children are inserted with bulk_create, unless model has post_save receivers. Models
+        with custom save(), or custom create() without bulk_insert_custom_create, are created one by one with create().
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            if not cls._bulk_insert_possible():
+                return [cls.create(**item) for item in items]
+
+            for item in items:
+                cls._bulk_check_create_arguments(item)
+            cleaned = [cls._clean_model_data_kwargs(**item) for item in cls._bulk_resolve_relations(items)]
+            created: List[Optional[AvishanModel]] = [None] * len(items)
+            plain = [(index, cls(**create_kwargs))
+                     for index, (create_kwargs, many_to_many_objects, after_creation) in enumerate(cleaned)
+                     if not many_to_many_objects and not after_creation]
+            cls._insert_many([instance for _, instance in plain])
+            for index, instance in plain:
+                created[index] = instance
+            for index, item_cleaned in enumerate(cleaned):
+                if created[index] is None:
+                    created[index] = cls._create_cleaned(*item_cleaned)
+            return created
+
+    @classmethod
+    def _bulk_insert_possible(cls) -> bool:
+        """Objects can be built from cleaned create kwargs, without calling create() or save() of model"""
+        if cls.save is not models.Model.save:
+            return False
+        return cls.create.__func__ is AvishanModel.create.__func__ or cls.bulk_insert_custom_create
+
+    @classmethod
+    def _bulk_check_create_arguments(cls, item: dict):
+        """Custom create() is skipped by bulk insertion, but its signature still decides accepted arguments"""
+        if cls.create.__func__ is AvishanModel.create.__func__:
+            return
+        signature = inspect.signature(cls.create)
+        try:
+            signature.bind(**item)
+        except TypeError:
+            parameters = signature.parameters.values()
+            unknown = [] if any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters) else \
+                [key for key in item.keys() if key not in signature.parameters.keys()]
+            missing = [parameter.name for parameter in parameters if parameter.default is inspect.Parameter.empty and
+                       parameter.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD) and
+                       parameter.name not in item.keys()]
+            raise ErrorMessageException(AvishanTranslatable(
+                EN=', '.join([f'field "{name}" is not acceptable' for name in unknown] +
+                             [f'field "{name}" is required' for name in missing]) or 'Fields are not valid'
+            ))
+
+    @classmethod
+    def _insert_many(cls, instances: List['AvishanModel']):
+        """
+        bulk_create, or saving one by one if database can not return created ids or model has post_save receivers
+        """
+        from django.db import connection
+
+        if len(instances) == 0:
+            return
+        if connection.features.can_return_rows_from_bulk_insert and cls._bulk_insert_allowed():
+            cls.objects.bulk_create(instances, batch_size=get_avishan_config().BULK_CREATE_BATCH_SIZE)
+        else:
+            for instance in instances:
+                instance.save(force_insert=True)
+            return
+        """bulk_create sends no signals"""
+        from avishan.signals import invalidate_response_cache
+        invalidate_response_cache(cls, instances[0])
+
+    @classmethod
+    def _bulk_insert_allowed(cls) -> bool:
+        """
+        bulk_create sends no post_save, so it is used only when there is no receiver for model other than response
+        cache invalidation, which _insert_many calls itself
+        """
+        from django.db.models.signals import post_save
+        from avishan.signals import invalidate_response_cache
+
+        if not post_save.has_listeners(cls):
+            return True
+        return all(receiver is invalidate_response_cache for receiver in post_save._live_receivers(cls))
+
+    @classmethod
+    def bulk(cls, **kwargs) -> List[dict]:
+        from avishan.exceptions import ErrorMessageException
+
+        items = kwargs.get('items', None)
+        if not isinstance(items, list):
+            raise ErrorMessageException('"items" should be list of objects')
+        if len(items) > get_avishan_config().BULK_CREATE_MAX_ITEMS:
+            raise ErrorMessageException(f'Maximum {get_avishan_config().BULK_CREATE_MAX_ITEMS} items can be created '
+                                        f'in one request')
+
+        results = cls.bulk_create_from_dicts(items)
+        created = [item for item, _ in results if item is not None]
+        if len(created) > 0:
+            cls.to_dict_load_related(created)
+        key = stringcase.snakecase(cls.class_name())
+        return [{key: item.to_dict()} if error is None else {'error': error} for item, error in results]
+
+    @classmethod
+    def bulk_create_from_dicts(cls, items: List[dict]) -> List[Tuple[Optional['AvishanModel'], Optional[str]]]:
+        """
+        Creates objects from list of create kwargs in one transaction. Items are validated first, relations given by
+        id are fetched with one query per related model and valid objects inserted with bulk_create (see _insert_many).
+        Items with many to many or related children, and models with custom save() or custom create() without
+        bulk_insert_custom_create, are created one by one with create().
+        A failing item does not stop others.
+        :return: (created object, None) or (None, error message) for each item, in same order
+        """
+        from django.db import transaction
+
+        results: List[Optional[tuple]] = [None] * len(items)
+        items = cls._bulk_resolve_relations(items)
+        default_create = cls._bulk_insert_possible()
+
+        with transaction.atomic():
+            pending = []
+            one_by_one = []
+            for index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    results[index] = (None, 'Item should be object')
+                    continue
+                if not default_create:
+                    one_by_one.append(index)
+                    continue
+                _, error = cls._bulk_call(cls._bulk_check_create_arguments, item)
+                if error is not None:
+                    results[index] = (None, error)
+                    continue
+                cleaned, error = cls._bulk_call(cls._clean_model_data_kwargs, **item)
+                if error is not None:
+                    results[index] = (None, error)
+                    continue
+                create_kwargs, many_to_many_objects, after_creation = cleaned
+                if many_to_many_objects or after_creation:
+                    one_by_one.append(index)
+                    continue
+                instance, error = cls._bulk_call(cls, **create_kwargs)
+                if error is not None:
+                    results[index] = (None, error)
+                    continue
+                pending.append((index, instance))
+
+            if len(pending) > 0:
+                try:
+                    with transaction.atomic():
+                        cls._insert_many([instance for _, instance in pending])
+                    for index, instance in pending:
+                        results[index] = (instance, None)
+                except Exception as e:
+                    """Find failing items by inserting them one by one"""
+                    print('bulk_create_error:'.upper(), e)
+                    for index, instance in pending:
+                        instance.pk = None
+                        instance._state.adding = True
+                        results[index] = cls._bulk_call(cls._bulk_insert_one, instance)
+
+            for index in one_by_one:
+                results[index] = cls._bulk_call(cls._bulk_create_one, items[index])
+
+        return results
+
+    @classmethod
+    def _bulk_resolve_relations(cls, items: List[dict]) -> List[dict]:
+        """Replaces {"id": x} relation values of items with objects, fetched with one query per field"""
+        is_id_dict = AvishanModel._is_id_dict
+
+        fields = [
+            field for field in cls.get_full_fields()
+            if isinstance(field, (models.ForeignKey, models.OneToOneField, models.ManyToManyField)) and
+            isinstance(field.related_model, type) and issubclass(field.related_model, AvishanModel) and
+            field.related_model is not TranslatableChar and
+            field.related_model.get_from_dict.__func__ is AvishanModel.get_from_dict.__func__
+        ]
+
+        ids = {field.name: set() for field in fields}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for field in fields:
+                value = item.get(field.name, None)
+                values = value if isinstance(field, models.ManyToManyField) and isinstance(value, list) else [value]
+                for entry in values:
+                    if is_id_dict(entry):
+                        ids[field.name].add(entry['id'])
+
+        found = {}
+        for field in fields:
+            if ids[field.name]:
+                found[field.name] = field.related_model.objects.in_bulk(list(ids[field.name]))
+        if len(found) == 0:
+            return items
+
+        resolved = []
+        for item in items:
+            if not isinstance(item, dict):
+                resolved.append(item)
+                continue
+            item = dict(item)
+            for field in fields:
+                if field.name not in found.keys() or field.name not in item.keys():
+                    continue
+                value = item[field.name]
+                if isinstance(field, models.ManyToManyField):
+                    if isinstance(value, list):
+                        item[field.name] = [found[field.name].get(entry['id'], entry) if is_id_dict(entry) else entry
+                                            for entry in value]
+                elif is_id_dict(value):
+                    item[field.name] = found[field.name].get(value['id'], value)
+            resolved.append(item)
+        return resolved
+
+    @classmethod
+    def _bulk_insert_one(cls, instance: 'AvishanModel') -> 'AvishanModel':
+        from django.db import transaction
+        with transaction.atomic():
+            instance.save(force_insert=True)
+        return instance
+
+    @classmethod
+    def _bulk_create_one(cls, item: dict) -> 'AvishanModel':
+        from django.db import transaction
+        with transaction.atomic():
+            return cls.create(**item)
+
+    @staticmethod
+    def _bulk_call(function: Callable, *args, **kwargs) -> Tuple[object, Optional[str]]:
+        """
+        Runs function and returns its error message instead of raising it. Status code, exception and messages set
+        on current request by AvishanException will be restored. Other exceptions are reported with a general message
+        of their kind, not their text.
+        """
+        request = get_current_request()
+        storage = getattr(request, 'avishan', None) if request is not None else None
+        snapshot = None
+        if storage is not None:
+            snapshot = (storage.status_code, storage.exception, storage.traceback,
+                        {key: list(value) for key, value in storage.messages.items()})
+        try:
+            return function(*args, **kwargs), None
+        except Exception as e:
+            error = None
+            if storage is not None:
+                """Only messages of raised AvishanException, as wrapped exceptions carry interpreter messages"""
+                if storage.exception is e and len(storage.messages['error']) > len(snapshot[3]['error']):
+                    error = storage.messages['error'][-1].get('body', None)
+                storage.status_code, storage.exception, storage.traceback, storage.messages = snapshot
+            if not error:
+                error = AvishanModel._bulk_error_message(e)
+            return None, error
+
+    @staticmethod
+    def _bulk_error_message(exception: Exception) -> str:
+        from django.core.exceptions import ValidationError
+
+        if isinstance(exception, ValidationError):
+            return ', '.join(exception.messages)
+        if isinstance(exception, TypeError):
+            return str(AvishanTranslatable(EN='Item fields are not valid', FA='فیلدهای آیتم معتبر نیستند'))
+        return str(AvishanTranslatable(EN='Item could not be created', FA='آیتم ساخته نشد'))
+
     def update(self, **kwargs):
 
         # todo deeply check unchanged
@@ -185,33 +498,97 @@ class AvishanModel(
             del kwargs[key]
 
         base_kwargs, many_to_many_kwargs, _ = self.__class__._clean_model_data_kwargs(on_update=True, **kwargs)
+        changed_fields = []
         for key, value in base_kwargs.items():
             # todo 0.2.3 check value types
+            attname = self._meta.get_field(key).attname
+            previous = getattr(self, attname)
             self.__setattr__(key, value)
+            if getattr(self, attname) != previous:
+                changed_fields.append(key)
 
+        many_to_many_changed = False
         if many_to_many_kwargs:
             for key, value in many_to_many_kwargs.items():
-                # todo 0.2.1 many to many efficient add/remove
-                self.__getattribute__(key).clear()
-                for item in value:
-                    self.__getattribute__(key).add(item)
-        self.save()
+                if self._update_many_to_many(key, value):
+                    many_to_many_changed = True
+
+        if self.pk is None or self.__class__.save is not models.Model.save:
+            """Overridden save may compute other fields too, so only a full save is safe"""
+            self.save()
+        elif changed_fields or many_to_many_changed:
+            auto_now_fields = [field.name for field in self._meta.concrete_fields
+                               if getattr(field, 'auto_now', False) and field.name not in changed_fields]
+            self.save(update_fields=changed_fields + auto_now_fields)
         return self
 
+    def _update_many_to_many(self, field_name: str, items: list) -> bool:
+        """
+        Sets many to many field to items, by removing and adding only differences with current rows.
+        :return: True if anything changed
+        """
+        manager = self.__getattribute__(field_name)
+        current = set(manager.values_list('pk', flat=True))
+        new_pks = set()
+        to_add = []
+        for item in items:
+            if item.pk not in new_pks:
+                new_pks.add(item.pk)
+                if item.pk not in current:
+                    to_add.append(item)
+        to_remove = current - new_pks
+
+        if to_remove:
+            manager.remove(*to_remove)
+        if to_add:
+            manager.add(*to_add)
+        return bool(to_remove or to_add)
+
     def remove(self) -> dict:
         temp = self.to_dict()
         self.delete()
         return temp
 
     @classmethod
-    def search(cls, query_set: models.QuerySet, search_text: str = None) -> models.QuerySet:
-        if search_text is None:
+    def search(cls, query_set: models.QuerySet, search_text: str = None, field_names: List[str] = None
+               ) -> models.QuerySet:
+        """
+        Filters query_set for search_text, ordered by rank when an indexed backend is used
+        :param field_names: search only in these fields. Indexed backend is used only when all of them are declared in
+        search_fields
+        """
+        from avishan.misc.search import get_search_backend
+
+        if search_text is None or len(search_text.strip()) == 0:
             return query_set
-        result = cls.objects.none()
-        for field in cls.get_fields():
-            if isinstance(field, models.CharField):
-                result = query_set.filter(**{f'{field.name}__icontains': search_text}) | result
-        return result.distinct()
+        fields = cls.search_field_weights()
+        indexed = len(cls.search_fields) > 0
+        if field_names is not None:
+            declared = {field.name: (field, weight) for field, weight in fields}
+            if indexed and set(field_names).issubset(declared.keys()):
+                fields = [declared[name] for name in field_names]
+            else:
+                indexed = False
+                fields = [(cls.get_field(name), 'A') for name in field_names]
+        return get_search_backend(query_set, indexed=indexed).search(cls, query_set, search_text, fields)
+
+    @classmethod
+    def search_field_weights(cls) -> List[Tuple[models.Field, str]]:
+        """(field, weight) pairs of search_fields, or all char fields with weight "A" when not declared"""
+        try:
+            return _search_field_weights[cls]
+        except KeyError:
+            pass
+
+        if len(cls.search_fields) == 0:
+            result = [(field, 'A') for field in cls.get_fields() if isinstance(field, models.CharField)]
+        else:
+            result = []
+            for item in cls.search_fields:
+                field, weight = item if isinstance(item, tuple) else (item, 'A')
+                result.append((cls.get_field(field if isinstance(field, str) else field.name), weight))
+        _search_field_weights[cls] = result
+        return result
 
     @classmethod
     def create_or_update(cls, fixed_kwargs: dict, new_additional_kwargs: dict):
@@ -241,69 +618,173 @@ class AvishanModel(
         Convert object to dict
         :return:
         """
-        from khayyam import JalaliDatetime, JalaliDate
+        return {name: convert(self) for name, convert in self.to_dict_plan(exclude_list)}
+
+    @classmethod
+    def to_dict_plan(cls, exclude_list: List[Union[models.Field, str]] = ()) -> List[Tuple[str, Callable]]:
+        """
+        (field name, converter) pairs used by to_dict. Built once per model class and exclude set, so fields, private
+        fields and config are not checked again for every object.
+        """
+        excluded = frozenset(item if isinstance(item, str) else item.name for item in exclude_list)
+        try:
+            return _to_dict_plans[(cls, excluded)]
+        except KeyError:
+            pass
+
+        private = {item if isinstance(item, str) else item.name for item in cls.to_dict_private_fields}
+        plan = [
+            (field.name, cls._to_dict_field_converter(field)) for field in cls.get_full_fields()
+            if field.name not in private and field.name not in excluded
+        ]
+        _to_dict_plans[(cls, excluded)] = plan
+        return plan
 
-        dicted = {}
+    @classmethod
+    def to_dict_related_lookups(cls, max_depth: int = None) -> Tuple[List[str], List[str]]:
+        """
+        select_related and prefetch_related lookups for relations that to_dict serializes, following private fields.
+        Relations of models with overridden to_dict are not followed.
+        :return: (select_related lookups, prefetch_related lookups)
+        """
+        if max_depth is None:
+            max_depth = get_avishan_config().TO_DICT_RELATED_MAX_DEPTH
+        try:
+            return _to_dict_related_lookups[(cls, max_depth)]
+        except KeyError:
+            pass
+
+        select_related = []
+        prefetch_related = []
+
+        def walk(model: Type[AvishanModel], prefix: str, depth: int, through_many: bool):
+            if depth > max_depth or model.to_dict is not AvishanModel.to_dict:
+                return
+            private = {item if isinstance(item, str) else item.name for item in model.to_dict_private_fields}
+            for field in model.get_full_fields():
+                if not field.is_relation or field.name in private or \
+                        not (isinstance(field.related_model, type) and issubclass(field.related_model, AvishanModel)):
+                    continue
+                lookup = prefix + field.name
+                is_many = through_many or isinstance(field, models.ManyToManyField)
+                if is_many:
+                    prefetch_related.append(lookup)
+                else:
+                    select_related.append(lookup)
+                walk(field.related_model, lookup + '__', depth + 1, is_many)
 
-        for field in self.get_full_fields():
-            if (field not in self.to_dict_private_fields and field.name not in self.to_dict_private_fields) and \
-                    (field not in exclude_list and field.name not in exclude_list):
-                value = self.get_data_from_field(field)
-                if value is None:
-                    dicted[field.name] = None
-                elif isinstance(field, models.DateField):
-                    if get_avishan_config().USE_DATETIME_DICT:
-                        if value is None:
-                            dicted[field.name] = {}
-                        if get_avishan_config().USE_JALALI_DATETIME:
-                            if isinstance(field, models.DateTimeField):
-                                value = JalaliDatetime(value)
-                            else:
-                                value = JalaliDate(value)
+        walk(cls, '', 1, False)
+        _to_dict_related_lookups[(cls, max_depth)] = (select_related, prefetch_related)
+        return select_related, prefetch_related
 
-                        if value is not None:
-                            dicted[field.name] = {
-                                'year': value.year,
-                                'month': value.month,
-                                'day': value.day
-                            }
-                            if isinstance(field, models.DateTimeField):
-                                dicted[field.name]['hour'] = value.hour
-                                dicted[field.name]['minute'] = value.minute
-                                dicted[field.name]['second'] = value.second
-                                dicted[field.name]['microsecond'] = value.microsecond
-                    else:
-                        if value is None:
-                            dicted[field.name] = None
-                        elif get_avishan_config().USE_JALALI_DATETIME:
-                            if isinstance(field, models.DateTimeField):
-                                format_string = get_avishan_config().DATETIME_STRING_FORMAT
-                                dicted[field.name] = JalaliDatetime(value)
-                            else:
-                                format_string = get_avishan_config().DATE_STRING_FORMAT
-                                dicted[field.name] = JalaliDate(value)
-                            dicted[field.name] = dicted[field.name].strftime(format_string)
-                        else:
-                            if isinstance(field, models.DateTimeField):
-                                dicted[field.name] = value.strftime(get_avishan_config().DATETIME_STRING_FORMAT)
-                            else:
-                                dicted[field.name] = value.strftime(get_avishan_config().DATE_STRING_FORMAT)
-
-                elif isinstance(field, (models.OneToOneField, models.ForeignKey)):
-                    dicted[field.name] = value.to_dict()
-                elif isinstance(field, models.ManyToManyField):
-                    dicted[field.name] = [item.to_dict() for item in value.all()]
-                elif isinstance(field, MoneyField):
-                    dicted[field.name] = value.amount
-                elif isinstance(value, datetime.time):
-                    dicted[field.name] = {
-                        'hour': value.hour, 'minute': value.minute, 'second': value.second,
-                        'microsecond': value.microsecond
+    @classmethod
+    def to_dict_load_related(cls, objects: Union[models.QuerySet, List['AvishanModel'], 'AvishanModel']) \
+            -> Union[models.QuerySet, List['AvishanModel'], 'AvishanModel']:
+        """
+        Loads relations needed for to_dict on queryset or already fetched objects in a few queries, instead of one
+        query per related object.
+        """
+        from django.db.models import prefetch_related_objects
+
+        select_related, prefetch_related = cls.to_dict_related_lookups()
+        if len(select_related) == 0 and len(prefetch_related) == 0:
+            return objects
+
+        if isinstance(objects, models.QuerySet):
+            if objects._result_cache is None and objects._fields is None and not objects.query.combinator:
+                if select_related:
+                    objects = objects.select_related(*select_related)
+                if prefetch_related:
+                    objects = objects.prefetch_related(*prefetch_related)
+                return objects
+            objects = list(objects)
+
+        if isinstance(objects, AvishanModel):
+            prefetch_related_objects([objects], *select_related, *prefetch_related)
+        elif len(objects) > 0:
+            prefetch_related_objects(objects, *select_related, *prefetch_related)
+        return objects
+
+    @classmethod
+    def _to_dict_field_converter(cls, field: models.Field) -> Callable:
+        """Values are read with attrgetter, or with get_data_from_field if model overrides it"""
+        from khayyam import JalaliDatetime, JalaliDate
+
+        if cls.get_data_from_field is not AvishanModel.get_data_from_field:
+            def getter(obj):
+                return obj.get_data_from_field(field)
+
+            many_to_many_getter = getter
+        else:
+            getter = operator.attrgetter(field.name)
+
+            def many_to_many_getter(obj):
+                return getter(obj).all()
+
+        if isinstance(field, models.DateField):
+            is_datetime = isinstance(field, models.DateTimeField)
+            jalali = (JalaliDatetime if is_datetime else JalaliDate) \
+                if get_avishan_config().USE_JALALI_DATETIME else None
+
+            if get_avishan_config().USE_DATETIME_DICT:
+                def convert(obj):
+                    value = getter(obj)
+                    if value is None:
+                        return None
+                    if jalali:
+                        value = jalali(value)
+                    dicted = {
+                        'year': value.year,
+                        'month': value.month,
+                        'day': value.day
                     }
-                else:
-                    dicted[field.name] = value
+                    if is_datetime:
+                        dicted['hour'] = value.hour
+                        dicted['minute'] = value.minute
+                        dicted['second'] = value.second
+                        dicted['microsecond'] = value.microsecond
+                    return dicted
+            else:
+                format_string = get_avishan_config().DATETIME_STRING_FORMAT if is_datetime \
+                    else get_avishan_config().DATE_STRING_FORMAT
+
+                def convert(obj):
+                    value = getter(obj)
+                    if value is None:
+                        return None
+                    if jalali:
+                        value = jalali(value)
+                    return value.strftime(format_string)
+            return convert
+
+        if isinstance(field, (models.OneToOneField, models.ForeignKey)):
+            def convert(obj):
+                value = getter(obj)
+                return None if value is None else value.to_dict()
+            return convert
+
+        if isinstance(field, models.ManyToManyField):
+            return lambda obj: [item.to_dict() for item in many_to_many_getter(obj)]
+
+        money_field = money_field_class()
+        if money_field is not None and isinstance(field, money_field):
+            def convert(obj):
+                value = getter(obj)
+                return None if value is None else value.amount
+            return convert
+
+        if isinstance(field, models.TimeField):
+            def convert(obj):
+                value = getter(obj)
+                if value is None:
+                    return None
+                return {
+                    'hour': value.hour, 'minute': value.minute, 'second': value.second,
+                    'microsecond': value.microsecond
+                }
+            return convert
 
-        return dicted
+        return getter
 
     @classmethod
     def _clean_model_data_kwargs(cls, force_write_on: List[str] = (), on_update: bool = False, **kwargs):
@@ -349,13 +830,7 @@ class AvishanModel(
                         else:
                             base_kwargs[field.name] = field.related_model.get_from_dict(kwargs[field.name])
             elif isinstance(field, models.ManyToManyField):
-                many_to_many_kwargs[field.name] = []
-                for input_item in kwargs[field.name]:
-                    if isinstance(input_item, models.Model):
-                        item_object = input_item
-                    else:
-                        item_object = field.related_model.get_from_dict(input_item)
-                    many_to_many_kwargs[field.name].append(item_object)
+                many_to_many_kwargs[field.name] = field.related_model.get_from_dict_list(kwargs[field.name])
             else:
                 base_kwargs[field.name] = cls.cast_field_data(kwargs[field.name], field)
 
@@ -500,10 +975,44 @@ class AvishanModel(
         """Usually when unique or one-to-one relations provided, this can help"""
         return cls.get(**input_dict)
 
+    @classmethod
+    def get_from_dict_list(cls, input_list: list) -> List['AvishanModel']:
+        """
+        get_from_dict for a list. Items with id are fetched together in one query, others with get_from_dict. Model
+        objects are returned as they are. Missing ids raise same error as get_from_dict.
+        """
+        if cls.get_from_dict.__func__ is not AvishanModel.get_from_dict.__func__:
+            return [item if isinstance(item, models.Model) else cls.get_from_dict(item) for item in input_list]
+
+        ids = [item['id'] for item in input_list if cls._is_id_dict(item)]
+        found = cls.objects.in_bulk(ids) if ids else {}
+        output = []
+        for item in input_list:
+            if isinstance(item, models.Model):
+                output.append(item)
+            elif cls._is_id_dict(item):
+                output.append(found[item['id']] if item['id'] in found.keys()
+                              else cls.get(avishan_raise_400=True, id=item['id']))
+            else:
+                output.append(cls.get_from_dict(item))
+        return output
+
+    @staticmethod
+    def _is_id_dict(value) -> bool:
+        """Dicts which get_from_dict finds by id shortcut"""
+        return isinstance(value, dict) and 'id' in value.keys() and isinstance(value['id'], int) and \
+            not isinstance(value['id'], bool)
+
     @classmethod
     def request_arg_get_from_dict(cls, input_dict: dict) -> 'AvishanModel':
         return cls.get_from_dict(input_dict)
 
+    @classmethod
+    def request_arg_get_from_dict_list(cls, input_list: List[dict]) -> List['AvishanModel']:
+        if cls.request_arg_get_from_dict.__func__ is not AvishanModel.request_arg_get_from_dict.__func__:
+            return [cls.request_arg_get_from_dict(item) for item in input_list]
+        return cls.get_from_dict_list(input_list)
+
     def get_data_from_field(self, field: models.Field):
         if isinstance(field, models.ManyToManyField):
             return self.__getattribute__(field.name).all()
@@ -580,6 +1089,7 @@ class UserGroup(AvishanModel):
         'id'
     ]
     django_admin_list_display = [title, token_valid_seconds]
+    bulk_insert_custom_create = True
 
     @classmethod
     def direct_callable_methods(cls) -> List[DirectCallable]:
@@ -705,12 +1215,12 @@ class Identifier(AvishanModel):
         total = [item for item in super().direct_callable_methods() if item.name in ('get', 'create')]
         for item in total:
             if item.name == 'create':
-                item.documentation.response_bodies.append(
+                item.update_documentation(lambda documentation: documentation.response_bodies.append(
                     ResponseBodyDocumentation(
                         title='Signature validation failed',
                         status_code=status.HTTP_406_NOT_ACCEPTABLE,
                     )
-                )
+                ))
         return total
 
     @classmethod
@@ -764,7 +1274,7 @@ class Email(Identifier):
         total = super().direct_callable_methods()
         for item in total:
             if item.name == 'create':
-                item.documentation.request_body.examples += [
+                item.update_documentation(lambda documentation: documentation.request_body.examples.extend([
                     RequestBodyDocumentation.Example(
                         name='foo',
                         summary='My Email',
@@ -774,12 +1284,12 @@ class Email(Identifier):
                     ),
                     RequestBodyDocumentation.Example(
                         name='bar',
-                        summary='Some random email',
+                        summary='Some other email',
                         value={
-                            "key": faker.email()
+                            "key": "john.doe@example.com"
                         }
                     )
-                ]
+                ]))
         return total
 
     def send_mail(self, subject: str, message: str, html_message: str = None):
@@ -830,7 +1340,7 @@ class Phone(Identifier):
         total = super().direct_callable_methods()
         for item in total:
             if item.name == 'create':
-                item.documentation.request_body.examples += [
+                item.update_documentation(lambda documentation: documentation.request_body.examples.extend([
                     RequestBodyDocumentation.Example(
                         name='foo',
                         summary='My Phone',
@@ -838,7 +1348,7 @@ class Phone(Identifier):
                             "key": "00989021207150"
                         }
                     )
-                ]
+                ]))
         return total
 
     @staticmethod
@@ -990,6 +1500,12 @@ class AuthenticationType(AvishanModel):
     django_admin_list_filter = [user_user_group]
     django_admin_search_fields = ['key']
     to_dict_private_fields = [last_used, last_login, last_logout, date_created, is_active]
+    """Config settings needed by this class, resolved into AuthenticationTypeSettings"""
+    authentication_settings_names: List[str] = []
+
+    @classmethod
+    def authentication_settings(cls) -> 'AuthenticationTypeSettings':
+        return get_avishan_config().authentication_type_settings(cls)
 
     @classmethod
     def direct_callable_methods(cls):
@@ -1000,7 +1516,7 @@ class AuthenticationType(AvishanModel):
                 method=DirectCallable.METHOD.POST,
                 authenticate=False,
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=f'{stringcase.titlecase(cls.class_name())} Login',
                     request_body=RequestBodyDocumentation(
                         attributes=RequestBodyDocumentation.AutoResolveRequestBody(),
@@ -1033,7 +1549,7 @@ class AuthenticationType(AvishanModel):
                 method=DirectCallable.METHOD.POST,
                 authenticate=False,
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=f'{stringcase.titlecase(cls.class_name())} Register',
                     request_body=RequestBodyDocumentation(
                         attributes=RequestBodyDocumentation.AutoResolveRequestBody(),
@@ -1065,7 +1581,7 @@ class AuthenticationType(AvishanModel):
                 target_name='logout',
                 url="/logout",
                 response_json_key=stringcase.snakecase(cls.class_name()),
-                documentation=ApiDocumentation(
+                documentation=lambda: ApiDocumentation(
                     title=f'{stringcase.titlecase(cls.class_name())} Logout',
                     response_bodies=[
                         ResponseBodyDocumentation(
@@ -1210,13 +1726,19 @@ class AuthenticationType(AvishanModel):
         self.last_used = None
         self.last_logout = None
         self.save()
+        self._purge_verified_tokens()
         self._populate_current_request()
 
     def _submit_logout(self):
         self.last_logout = timezone.now()
         self.save()
+        self._purge_verified_tokens()
         get_current_request().avishan.add_token = False
 
+    def _purge_verified_tokens(self):
+        from avishan.misc.token_cache import get_verified_token_cache
+        get_verified_token_cache().purge(self.class_name(), self.id)
+
     def _populate_current_request(self):
         request = get_current_request()
         request.avishan: AvishanRequestStorage
@@ -1237,22 +1759,25 @@ class VerifiableAuthenticationType(AuthenticationType):
     verification = models.OneToOneField(AuthenticationVerification, on_delete=models.SET_NULL, null=True, blank=True)
 
     to_dict_private_fields = [verification, 'last_used', 'last_login', 'last_logout', 'date_created', 'is_active']
+    authentication_settings_names = AuthenticationType.authentication_settings_names + [
+        'VERIFICATION_REQUIRED', 'VERIFICATION_CODE_GAP_SECONDS', 'VERIFICATION_CODE_LENGTH',
+        'VERIFICATION_CODE_DOMAIN', 'VERIFICATION_CODE_VALID_SECONDS'
+    ]
 
     def must_verify(self) -> bool:
-        if getattr(get_avishan_config(), stringcase.constcase(self.class_name()) + '_VERIFICATION_REQUIRED'):
+        if self.authentication_settings().verification_required:
             return True
         return self.date_verified is not None
 
     def start_verification(self):
         self: Union[
             EmailKeyValueAuthentication, PhoneKeyValueAuthentication, EmailOtpAuthentication, PhoneOtpAuthentication]
-        if not getattr(get_avishan_config(), stringcase.constcase(self.class_name()) + '_VERIFICATION_REQUIRED'):
+        if not self.authentication_settings().verification_required:
             return
         if self.verification:
             if not self.verification.date_created or \
                     (timezone.now() - self.verification.date_created).total_seconds() < \
-                    getattr(get_avishan_config(),
-                            stringcase.constcase(self.class_name()) + '_VERIFICATION_CODE_GAP_SECONDS'):
+                    self.authentication_settings().verification_code_gap_seconds:
                 raise ErrorMessageException(AvishanTranslatable(
                     EN='Code created recently, try again later',
                     FA='کد به تازگی ایجاد شده است، کمی بعد تلاش کنید'
@@ -1262,21 +1787,16 @@ class VerifiableAuthenticationType(AuthenticationType):
 
         self.date_verified = None
         self.verification = AuthenticationVerification.create(
-            code_length=getattr(get_avishan_config(),
-                                stringcase.constcase(self.class_name()) + '_VERIFICATION_CODE_LENGTH'),
-            code_domain=getattr(get_avishan_config(),
-                                stringcase.constcase(self.class_name()) + '_VERIFICATION_CODE_DOMAIN')
+            code_length=self.authentication_settings().verification_code_length,
+            code_domain=self.authentication_settings().verification_code_domain
         )
         self.save()
 
         if self._related_key_model() is Email:
-            message = getattr(get_avishan_config(), stringcase.snakecase(self.class_name()) +
-                              '_verification_body')(self)
-            html_message = getattr(get_avishan_config(), stringcase.snakecase(self.class_name()) +
-                                   '_verification_html_body')(self)
+            message = self.authentication_settings().verification_body(self)
+            html_message = self.authentication_settings().verification_html_body(self)
             self.key.send_mail(
-                subject=getattr(get_avishan_config(), stringcase.snakecase(self.class_name()) +
-                                '_verification_subject')(self),
+                subject=self.authentication_settings().verification_subject(self),
                 message=message,
                 html_message=html_message
             )
@@ -1297,8 +1817,7 @@ class VerifiableAuthenticationType(AuthenticationType):
             ))
         if not self.verification.check_code(
                 entered_code=code,
-                valid_seconds=getattr(get_avishan_config(), stringcase.constcase(self.class_name()) +
-                                                            '_VERIFICATION_CODE_VALID_SECONDS')
+                valid_seconds=self.authentication_settings().verification_code_valid_seconds
         ):
             raise ErrorMessageException(AvishanTranslatable(
                 EN='Incorrect Code',
@@ -1314,8 +1833,7 @@ class VerifiableAuthenticationType(AuthenticationType):
     def _login_before_submit_actions(cls, data: dict):
         super()._login_before_submit_actions(data)
         found_object: cls = data['found_object']
-        if getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) + '_VERIFICATION_REQUIRED') \
-                and found_object.date_verified is None:
+        if cls.authentication_settings().verification_required and found_object.date_verified is None:
             data['submit_login'] = False
             get_current_request().avishan.status_code = status.HTTP_401_UNAUTHORIZED
 
@@ -1354,6 +1872,10 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
 
     to_dict_private_fields = [hashed_password, 'verification', 'last_used', 'last_login', 'last_logout', 'date_created',
                               'is_active', change_password_token, change_password_date]
+    authentication_settings_names = VerifiableAuthenticationType.authentication_settings_names + [
+        'RESET_PASSWORD_GAP_SECONDS', 'RESET_PASSWORD_VALID_SECONDS', 'RESET_PASSWORD_TOKEN_LENGTH',
+        'RESET_PASSWORD_TOKEN_DOMAIN'
+    ]
 
     @classmethod
     def register(cls, key: Union[Email, Phone], user_user_group: UserUserGroup, password: str = None,
@@ -1409,8 +1931,8 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
             raise AuthException(AuthException.ACCOUNT_NOT_FOUND)
 
         """Check for gap seconds"""
-        if found.change_password_token and (timezone.now() - found.change_password_date).total_seconds() < getattr(
-                get_avishan_config(), stringcase.constcase(cls.class_name()) + '_RESET_PASSWORD_GAP_SECONDS'):
+        if found.change_password_token and (timezone.now() - found.change_password_date).total_seconds() < \
+                cls.authentication_settings().reset_password_gap_seconds:
             raise ErrorMessageException('Reset password applied recently, please try later')
 
         """Do routine"""
@@ -1418,30 +1940,24 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
 
         """Sending Part"""
         if found._related_key_model() is Email:
-            message = getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) +
-                              '_RESET_PASSWORD_BODY')
+            message = cls.authentication_settings().reset_password_body
             html_message = render_to_string(
-                template_name=getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) +
-                                      '_RESET_PASSWORD_HTML_BODY_TEMPLATE_NAME'),
+                template_name=cls.authentication_settings().reset_password_html_body_template_name,
                 context={'token': found.change_password_token}
             ) \
-                if getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) +
-                           '_RESET_PASSWORD_HTML_BODY_TEMPLATE_NAME') \
+                if cls.authentication_settings().reset_password_html_body_template_name \
                 else None
             if message:
                 message = message.format(token=found.change_password_token)
             found.key.send_mail(
-                subject=getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) +
-                                '_RESET_PASSWORD_SUBJECT'),
+                subject=cls.authentication_settings().reset_password_subject,
                 message=message,
                 html_message=html_message
             )
         elif found._related_key_model() is Phone:
             found.key.send_verification_sms(
                 code=found.change_password_token,
-                template=getattr(
-                    get_avishan_config(), stringcase.constcase(cls.class_name()) + '_RESET_PASSWORD_SMS_TEMPLATE'
-                )
+                template=cls.authentication_settings().reset_password_sms_template
             )
         else:
             raise NotImplementedError()
@@ -1454,9 +1970,8 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
         if not found:
             raise AuthException(AuthException.ACCOUNT_NOT_FOUND)
 
-        if not found.change_password_date or (timezone.now() - found.change_password_date).total_seconds() > getattr(
-                get_avishan_config(), stringcase.constcase(cls.class_name()) + '_RESET_PASSWORD_VALID_SECONDS'
-        ):
+        if not found.change_password_date or (timezone.now() - found.change_password_date).total_seconds() > \
+                cls.authentication_settings().reset_password_valid_seconds:
             raise ErrorMessageException('Reset password code expired, apply for a new one')
 
         return found.change_password_token == token
@@ -1470,10 +1985,8 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
 
     def _reset_password(self):
         self.change_password_token = ''.join(
-            random.choice(getattr(get_avishan_config(), stringcase.constcase(self.class_name()) +
-                                  '_RESET_PASSWORD_TOKEN_DOMAIN')) for _ in
-            range(getattr(get_avishan_config(), stringcase.constcase(self.class_name()) +
-                          '_RESET_PASSWORD_TOKEN_LENGTH')))
+            random.choice(self.authentication_settings().reset_password_token_domain) for _ in
+            range(self.authentication_settings().reset_password_token_length))
         self.change_password_date = timezone.now()
         self.save()
 
@@ -1514,19 +2027,24 @@ class KeyValueAuthentication(VerifiableAuthenticationType):
 class EmailKeyValueAuthentication(KeyValueAuthentication):
     key = models.ForeignKey(Email, on_delete=models.CASCADE, related_name='key_value_authentications')
 
+    authentication_settings_names = KeyValueAuthentication.authentication_settings_names + [
+        'RESET_PASSWORD_BODY', 'RESET_PASSWORD_SUBJECT', 'RESET_PASSWORD_HTML_BODY_TEMPLATE_NAME',
+        'verification_subject', 'verification_body', 'verification_html_body'
+    ]
+
     @classmethod
     def direct_callable_methods(cls):
         total = super().direct_callable_methods()
-        fake_email = faker.email()
+        example_email = 'john.doe@example.com'
         for item in total:
             if item.name == 'register':
-                item.documentation.request_body.examples += [
+                item.update_documentation(lambda documentation: documentation.request_body.examples.extend([
                     RequestBodyDocumentation.Example(
                         name='foo',
                         summary='Example 1',
                         value={
                             "key": {
-                                "key": fake_email
+                                "key": example_email
                             },
                             "password": "XXXXXXXX",
                             "user_user_group": {
@@ -1534,15 +2052,15 @@ class EmailKeyValueAuthentication(KeyValueAuthentication):
                             }
                         }
                     )
-                ]
+                ]))
             if item.name == 'login':
-                item.documentation.request_body.examples += [
+                item.update_documentation(lambda documentation: documentation.request_body.examples.extend([
                     RequestBodyDocumentation.Example(
                         name='foo',
                         summary='Example 1',
                         value={
                             "key": {
-                                "key": fake_email
+                                "key": example_email
                             },
                             "password": "XXXXXXXX",
                             "user_group": {
@@ -1550,13 +2068,17 @@ class EmailKeyValueAuthentication(KeyValueAuthentication):
                             }
                         }
                     )
-                ]
+                ]))
         return total
 
 
 class PhoneKeyValueAuthentication(KeyValueAuthentication):
     key = models.ForeignKey(Phone, on_delete=models.CASCADE, related_name='key_value_authentications')
 
+    authentication_settings_names = KeyValueAuthentication.authentication_settings_names + [
+        'RESET_PASSWORD_SMS_TEMPLATE'
+    ]
+
 
 class OtpAuthentication(VerifiableAuthenticationType):
     class Meta:
@@ -1599,6 +2121,10 @@ class OtpAuthentication(VerifiableAuthenticationType):
 class EmailOtpAuthentication(OtpAuthentication):
     key = models.ForeignKey(Email, on_delete=models.CASCADE, related_name='otp_authentications')
 
+    authentication_settings_names = OtpAuthentication.authentication_settings_names + [
+        'verification_subject', 'verification_body', 'verification_html_body'
+    ]
+
 
 class PhoneOtpAuthentication(OtpAuthentication):
     key = models.ForeignKey(Phone, on_delete=models.CASCADE, related_name='otp_authentications')
@@ -1610,6 +2136,8 @@ class KeyAuthentication(AuthenticationType):
 
     key = models.CharField(max_length=255)
 
+    authentication_settings_names = AuthenticationType.authentication_settings_names + ['KEY_LENGTH']
+
     @classmethod
     def create(cls, key: str, user_user_group: UserUserGroup):
         return super().create(
@@ -1648,8 +2176,7 @@ class KeyAuthentication(AuthenticationType):
     @classmethod
     def generate_key(cls) -> str:
         import secrets
-        return secrets.token_urlsafe(
-            getattr(get_avishan_config(), stringcase.constcase(cls.class_name()) + '_KEY_LENGTH'))
+        return secrets.token_urlsafe(cls.authentication_settings().key_length)
 
 
 class VisitorKeyAuthentication(KeyAuthentication):
@@ -1811,9 +2338,16 @@ class RequestTrack(AvishanModel):
     view_execution_milliseconds = models.BigIntegerField(null=True, blank=True)
     authentication_type_class_title = models.CharField(max_length=255, blank=True, null=True)
     authentication_type_object_id = models.IntegerField(blank=True, null=True)
+    query_count = models.IntegerField(blank=True, null=True, help_text='Database queries executed')
+    query_execution_milliseconds = models.FloatField(blank=True, null=True, help_text='Total database time')
+    query_duplicate_count = models.IntegerField(blank=True, null=True,
+                                                help_text='Executions of statements beyond their first run')
+    query_slowest = models.TextField(blank=True, null=True, help_text='Slowest statements, as json')
+    query_duplicates = models.TextField(blank=True, null=True, help_text='Most repeated statements, as json')
 
     django_admin_search_fields = [url]
-    django_admin_list_display = ['clean_url', method, status_code, user_user_group, 'time', 'total_exec', 'view_exec']
+    django_admin_list_display = ['clean_url', method, status_code, user_user_group, 'time', 'total_exec', 'view_exec',
+                                 query_count, query_duplicate_count]
     django_admin_list_filter = ['url']
 
     export_ignore = True
@@ -1846,6 +2380,7 @@ class RequestTrackException(AvishanModel):
     django_admin_raw_id_fields = [request_track]
 
     export_ignore = True
+    bulk_insert_custom_create = True
 
     @classmethod
     def create(cls, request_track: RequestTrack, class_title: str, args: str,
@@ -1934,6 +2469,8 @@ class Activity(AvishanModel):
         user_user_group = get_current_request().avishan.user_user_group
         if not request_track and not user_user_group:
             return
+        if request_track is not None and request_track.pk is None:
+            request_track.save()
         return super().create(
             title=title,
             user_user_group=user_user_group if user_user_group else request_track.user_user_group,
@@ -2045,6 +2582,7 @@ class City(AvishanModel):
     longitude = models.FloatField(blank=True, null=True)
 
     django_admin_list_display = ['title', 'country']
+    bulk_insert_custom_create = True
 
     @classmethod
     def create(cls, title: str, country: Country):
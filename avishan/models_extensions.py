@@ -1,17 +1,30 @@
-from typing import Optional, List, Union, Type
+from typing import Optional, List, Union, Type, Iterable, Dict
 
 import django_filters
 import stringcase
 from crum import get_current_request
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.db import models
-from django.db.models import NOT_PROVIDED, QuerySet, Field
+from django.db.models import NOT_PROVIDED, QuerySet, Field, Q
 
 from avishan.descriptor import FunctionAttribute, DjangoFieldAttribute, ResponseBodyDocumentation, Attribute, \
     RequestBodyDocumentation, DataModel, Function
 from avishan.misc import status
 
 import ast
+import threading
+from collections import OrderedDict
+
+"""
+Generated FilterSet classes, keyed by (model class, used field names or None for all fields). Least recently used
+classes are dropped after DJANGO_FILTER_CLASS_CACHE_SIZE entries, as every combination of used fields makes a key
+"""
+_django_filter_classes: OrderedDict = OrderedDict()
+_django_filter_classes_lock = threading.Lock()
+"""Field names of each model that can be filtered, keyed by model class"""
+_django_filter_field_names: Dict[type, frozenset] = {}
+"""AvishanModel.get_model_registry() result, after django apps loaded"""
+_model_registry: Optional[dict] = None
 
 
 class AvishanModelDjangoAdminExtension:
@@ -59,45 +72,85 @@ class AvishanModelModelDetailsExtension:
     def get_models(app_name: str = None) -> list:
         from avishan.models import AvishanModel
 
-        def get_sub_classes(parent):
-            subs = [parent]
-            for child in parent.__subclasses__():
-                subs += get_sub_classes(child)
-            return subs
-
-        total = []
+        registry = AvishanModel.get_model_registry()
         if not app_name:
-            for model in AvishanModel.__subclasses__():
-                total += get_sub_classes(model)
-            return list(set(total))
-
-        return [x for x in AvishanModel.get_models() if x._meta.app_label == app_name]
+            return list(registry['models'])
+        return list(registry['by_app'].get(app_name, []))
 
     @staticmethod
     def get_model_with_class_name(class_name: str) -> Optional[type]:
         from avishan.models import AvishanModel
-        for item in AvishanModel.get_models():
-            if item.class_name() == class_name:
-                return item
-        return None
+        return AvishanModel.get_model_registry()['by_class_name'].get(class_name, None)
 
     @staticmethod
     def get_model_by_plural_snake_case_name(name: str) -> Optional[type]:
         from avishan.models import AvishanModel
-        for model in AvishanModel.get_non_abstract_models():
-            model: AvishanModel
-            if model.class_plural_snake_case_name() == name:
-                return model
-        return None
+        return AvishanModel.get_model_registry()['by_plural_snake_case_name'].get(name, None)
 
     @staticmethod
     def get_model_by_snake_case_name(name: str) -> Optional[type]:
         from avishan.models import AvishanModel
-        for model in AvishanModel.get_non_abstract_models():
-            model: AvishanModel
-            if model.class_snake_case_name() == name:
-                return model
-        return None
+        return AvishanModel.get_model_registry()['by_snake_case_name'].get(name, None)
+
+    @staticmethod
+    def get_model_registry() -> dict:
+        """
+        Model lookup tables. They are built once after django apps loaded; before that, they are built on each call.
+        """
+        from django.apps import apps
+        from avishan.models import AvishanModel
+
+        global _model_registry
+        if _model_registry is not None:
+            return _model_registry
+        registry = AvishanModel.build_model_registry()
+        if apps.ready:
+            _model_registry = registry
+        return registry
+
+    @staticmethod
+    def build_model_registry() -> dict:
+        """
+        Scans AvishanModel subclasses and creates lookup tables. Class name lookup contains abstract models too,
+        snake case lookups only non-abstract ones.
+        """
+        from avishan.models import AvishanModel
+
+        def get_sub_classes(parent):
+            subs = [parent]
+            for child in parent.__subclasses__():
+                subs += get_sub_classes(child)
+            return subs
+
+        total = []
+        for model in AvishanModel.__subclasses__():
+            for item in get_sub_classes(model):
+                if item not in total:
+                    total.append(item)
+
+        by_class_name = {}
+        by_snake_case_name = {}
+        by_plural_snake_case_name = {}
+        by_app = {}
+        for model in total:
+            by_class_name.setdefault(model.class_name(), model)
+            by_app.setdefault(model._meta.app_label, []).append(model)
+            if model._meta.abstract is False:
+                by_snake_case_name.setdefault(model.class_snake_case_name(), model)
+                by_plural_snake_case_name.setdefault(model.class_plural_snake_case_name(), model)
+
+        return {
+            'models': tuple(total),
+            'by_class_name': by_class_name,
+            'by_snake_case_name': by_snake_case_name,
+            'by_plural_snake_case_name': by_plural_snake_case_name,
+            'by_app': {key: tuple(value) for key, value in by_app.items()}
+        }
+
+    @staticmethod
+    def clear_model_registry():
+        global _model_registry
+        _model_registry = None
 
     @staticmethod
     def get_app_names() -> List[str]:
@@ -193,11 +246,13 @@ class AvishanModelFilterExtension:
 
     @classmethod
     def queryset_handler(cls, params: dict, queryset: QuerySet):
-        queryset: QuerySet = cls.django_filter_class()(data=params, queryset=queryset).qs
+        queryset: QuerySet = cls.django_filter_class(params.keys())(data=params, queryset=queryset).qs
         queryset = cls.relational_filters(queryset, data=params)
         if 'sort' in params.keys():
             queryset = queryset.order_by(*params['sort'][1:-1].split(","))
-        if 'page' in params.keys():
+        if 'cursor' in params.keys():
+            queryset = cls.cursor_paginate(params, queryset)
+        elif 'page' in params.keys():
             paginator = Paginator(queryset, per_page=params.get('page_size', 20))
             try:
                 page_object = paginator.page(int(params['page']))
@@ -218,17 +273,175 @@ class AvishanModelFilterExtension:
         return queryset
 
     @classmethod
-    def django_filter_class(cls) -> Union[Type[django_filters.FilterSet], type]:
+    def cursor_paginate(cls, params: dict, queryset: QuerySet) -> list:
+        """
+        Keyset pagination: instead of counting rows and using OFFSET, next page starts after values of the last item
+        in ordering. Ordering comes from "sort" param (or queryset ordering) and "id" is added to it as tie-breaker.
+        Empty "cursor" means first page. Null values are ordered after all other values, in both directions of sort.
+        Total objects count is calculated only if "count" param is true.
+        """
+        import base64
+        import json
+        from django.core.serializers.json import DjangoJSONEncoder
+        from django.db.models import F
+        from avishan.exceptions import ErrorMessageException
+
+        if 'sort' in params.keys():
+            ordering = [item.strip() for item in params['sort'][1:-1].split(",") if item.strip()]
+        else:
+            ordering = [item for item in queryset.query.order_by if isinstance(item, str)]
+        if not any(item.lstrip('-') in ['id', 'pk'] for item in ordering):
+            ordering.append('id')
+
+        try:
+            page_size = int(params.get('page_size', 20))
+        except ValueError:
+            raise ErrorMessageException('page_size should be integer')
+
+        total_objects = None
+        if str(params.get('count', '')).lower() in ['1', 'true']:
+            total_objects = queryset.count()
+
+        values = None
+        backward = False
+        if params['cursor']:
+            try:
+                decoded = json.loads(base64.urlsafe_b64decode(params['cursor'].encode()).decode())
+                values = decoded['v']
+                backward = decoded['d'] == 'p'
+                if len(values) != len(ordering):
+                    raise ValueError()
+            except (ValueError, KeyError, TypeError):
+                raise ErrorMessageException('Invalid cursor')
+
+        if backward:
+            ordering = [item[1:] if item.startswith('-') else '-' + item for item in ordering]
+        queryset = queryset.order_by(*[
+            F(item[1:]).desc(nulls_first=True) if item.startswith('-') else F(item).asc(nulls_last=True)
+            for item in ordering
+        ])
+
+        if values is not None:
+            condition = Q(pk__in=[])
+            for index, item in enumerate(ordering):
+                step = cls._cursor_after_condition(item, values[index])
+                if step is None:
+                    continue
+                for previous_index in range(index):
+                    field_name = ordering[previous_index].lstrip('-')
+                    if values[previous_index] is None:
+                        step &= Q(**{field_name + '__isnull': True})
+                    else:
+                        step &= Q(**{field_name: values[previous_index]})
+                condition |= step
+            queryset = queryset.filter(condition)
+
+        items = list(queryset[:page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if backward:
+            items.reverse()
+            ordering = [item[1:] if item.startswith('-') else '-' + item for item in ordering]
+
+        def encode_cursor(obj, direction: str) -> str:
+            return base64.urlsafe_b64encode(json.dumps({
+                'v': [cls._cursor_value(obj, item.lstrip('-')) for item in ordering],
+                'd': direction
+            }, cls=DjangoJSONEncoder).encode()).decode()
+
+        has_next = has_more if not backward else True
+        has_previous = has_more if backward else values is not None
+        pagination = {
+            'page_size': page_size,
+            'has_next': has_next and len(items) > 0,
+            'has_previous': has_previous and len(items) > 0,
+            'next_cursor': encode_cursor(items[-1], 'n') if has_next and len(items) > 0 else None,
+            'previous_cursor': encode_cursor(items[0], 'p') if has_previous and len(items) > 0 else None
+        }
+        if total_objects is not None:
+            pagination['total_objects'] = total_objects
+        get_current_request().avishan.response['pagination'] = pagination
+        return items
+
+    @staticmethod
+    def _cursor_after_condition(item: str, value) -> Optional[Q]:
+        """
+        Rows after value in ordering item, where null is greater than every value. None when no row can be after it.
+        """
+        field_name = item.lstrip('-')
+        if item.startswith('-'):
+            if value is None:
+                return Q(**{field_name + '__isnull': False})
+            return Q(**{field_name + '__lt': value})
+        if value is None:
+            return None
+        return Q(**{field_name + '__gt': value}) | Q(**{field_name + '__isnull': True})
+
+    @staticmethod
+    def _cursor_value(obj, lookup: str):
+        value = obj
+        for part in lookup.split('__'):
+            if value is None:
+                return None
+            value = getattr(value, part)
+        if isinstance(value, models.Model):
+            return value.pk
+        return value
+
+    @classmethod
+    def django_filter_class(cls, params_keys: Iterable[str] = None) -> Union[Type[django_filters.FilterSet], type]:
+        """
+        FilterSet class for this model. If params_keys passed, only filters of fields used in these keys will be
+        created. Classes are cached per model and used fields; clear_django_filter_classes() resets cache.
+        """
         from avishan.models import AvishanModel
         cls: Union[AvishanModel, AvishanModelFilterExtension]
-        return type(
+
+        if params_keys is None:
+            field_names = None
+        else:
+            field_names = frozenset(key.split('__')[0] for key in params_keys) & cls._django_filter_field_names()
+        from avishan.configure import get_avishan_config
+
+        key = (cls, field_names)
+        with _django_filter_classes_lock:
+            try:
+                _django_filter_classes.move_to_end(key)
+                return _django_filter_classes[key]
+            except KeyError:
+                pass
+
+        created = type(
             cls.class_name() + "Filter",
             (django_filters.FilterSet,),
-            cls._django_filter_class_properties()
+            cls._django_filter_class_properties(field_names)
         )
+        max_size = get_avishan_config().DJANGO_FILTER_CLASS_CACHE_SIZE
+        if max_size <= 0:
+            return created
+        with _django_filter_classes_lock:
+            _django_filter_classes[key] = created
+            while len(_django_filter_classes) > max_size:
+                _django_filter_classes.popitem(last=False)
+        return created
+
+    @staticmethod
+    def clear_django_filter_classes():
+        with _django_filter_classes_lock:
+            _django_filter_classes.clear()
+        _django_filter_field_names.clear()
+
+    @classmethod
+    def _django_filter_field_names(cls) -> frozenset:
+        try:
+            return _django_filter_field_names[cls]
+        except KeyError:
+            pass
+        _django_filter_field_names[cls] = frozenset(field.name for field in cls.get_fields())
+        return _django_filter_field_names[cls]
 
     @classmethod
-    def _django_filter_class_properties(cls) -> dict:
+    def _django_filter_class_properties(cls, field_names: Iterable[str] = None) -> dict:
         from avishan.models import AvishanModel
         cls: AvishanModel
 
@@ -238,6 +451,8 @@ class AvishanModelFilterExtension:
 
         fields = []
         for field in cls.get_fields():
+            if field_names is not None and field.name not in field_names:
+                continue
             class_dict = {**class_dict, **cls._django_filter_lookups_from_field(field)}
             fields.append(field.name)
 
@@ -254,6 +469,11 @@ class AvishanModelFilterExtension:
 
         return class_dict
 
+    @classmethod
+    def _django_filter_search(cls, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """"<field>__search" filters use model search, so indexed backends and ranking apply to them too"""
+        return cls.search(queryset, value, field_names=[name])
+
     @classmethod
     def _django_filter_lookups_from_field(cls, field: Field) -> dict:
         data = {
@@ -274,7 +494,8 @@ class AvishanModelFilterExtension:
         # chars
         if isinstance(field, (models.CharField, models.TextField)):
             data[field.name] = django_filters.CharFilter(field_name=field.name, lookup_expr='iexact')
-            data[field.name + '__search'] = django_filters.CharFilter(field_name=field.name, lookup_expr='icontains')
+            data[field.name + '__search'] = django_filters.CharFilter(field_name=field.name,
+                                                                      method=cls._django_filter_search)
             data[field.name + '__in'] = django_filters.CharFilter(field_name=field.name, lookup_expr='in')
             data[field.name + '__startswith'] = django_filters.CharFilter(field_name=field.name,
                                                                           lookup_expr='istartswith')
@@ -597,3 +818,52 @@ class AvishanModelDescriptorExtension:
     def _remove_authenticate(cls) -> bool:
         from avishan.configure import get_avishan_config
         return get_avishan_config().CRUD_AUTHENTICATE.get(cls.class_name(), cls.DEFAULT_CRUD_DICT).get('remove', True)
+
+    @classmethod
+    def _bulk_documentation_title(cls):
+        from avishan.models import AvishanModel
+        cls: AvishanModel
+        return f'Bulk create {cls.class_plural_name()}'
+
+    @classmethod
+    def _bulk_documentation_description(cls):
+        return "Creates items in one transaction. Result of each item is in same index of response list, containing " \
+               "created object or error message. Items are inserted together when model allows it, otherwise they " \
+               "are created one by one."
+
+    @classmethod
+    def _bulk_documentation_request_body(cls) -> RequestBodyDocumentation:
+        from avishan.models import AvishanModel
+        cls: AvishanModel
+        return RequestBodyDocumentation(
+            attributes=[Attribute(
+                name='items',
+                type=Attribute.TYPE.ARRAY,
+                type_of=DataModel(name=f'{cls.class_name()}BulkItem', attributes=cls._create_default_args())
+            )]
+        )
+
+    @classmethod
+    def _bulk_documentation_response_bodies(cls) -> List[ResponseBodyDocumentation]:
+        from avishan.models import AvishanModel
+        cls: AvishanModel
+        return [
+            ResponseBodyDocumentation(
+                title='Result per item',
+                attributes=[Attribute(
+                    name=stringcase.snakecase(cls.class_plural_name()),
+                    type=Attribute.TYPE.ARRAY,
+                    type_of=DataModel(name=f'{cls.class_name()}BulkResult', attributes=[
+                        Attribute(name=stringcase.snakecase(cls.class_name()), type=Attribute.TYPE.OBJECT,
+                                  type_of=cls, is_required=False),
+                        Attribute(name='error', type=Attribute.TYPE.STRING, is_required=False)
+                    ])
+                )]
+            )
+        ]
+
+    @classmethod
+    def _bulk_authenticate(cls) -> bool:
+        from avishan.configure import get_avishan_config
+        return get_avishan_config().CRUD_AUTHENTICATE.get(cls.class_name(), cls.DEFAULT_CRUD_DICT).get(
+            'bulk', cls._create_authenticate())
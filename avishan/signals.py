@@ -0,0 +1,84 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+
+def connect_signals():
+    from avishan.models import AvishanModel, AuthenticationType, BaseUser, UserGroup, UserUserGroup
+
+    for model in [BaseUser, UserGroup, UserUserGroup] + [item for item in AvishanModel.get_non_abstract_models()
+                                                         if issubclass(item, AuthenticationType)]:
+        post_save.connect(invalidate_authentication_cache, sender=model,
+                          dispatch_uid=f'avishan_authentication_cache_save_{model.class_name()}')
+        post_delete.connect(invalidate_authentication_cache, sender=model,
+                            dispatch_uid=f'avishan_authentication_cache_delete_{model.class_name()}')
+
+    connect_response_cache_signals()
+
+
+def connect_response_cache_signals():
+    from django.db import models
+    from avishan.misc import response_cache
+
+    related = set()
+    for model in response_cache.cached_models():
+        related |= response_cache.related_models(model)
+    for model in related:
+        post_save.connect(invalidate_response_cache, sender=model,
+                          dispatch_uid=f'avishan_response_cache_save_{model._meta.label_lower}')
+        post_delete.connect(invalidate_response_cache, sender=model,
+                            dispatch_uid=f'avishan_response_cache_delete_{model._meta.label_lower}')
+        for field in model._meta.get_fields():
+            if isinstance(field, models.ManyToManyField):
+                through = field.remote_field.through
+                m2m_changed.connect(invalidate_response_cache_m2m, sender=through,
+                                    dispatch_uid=f'avishan_response_cache_m2m_{through._meta.label_lower}')
+
+
+def invalidate_authentication_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    Removes cached authentication objects related to changed instance. Login, logout and deactivations are all saves
+    on these models. Saving only "last_used" does not change authentication.
+    """
+    from avishan.configure import get_avishan_config
+    from avishan.models import AvishanModel, AuthenticationType, BaseUser, UserGroup, UserUserGroup
+    from avishan.utils import invalidate_authentication_object_cache
+
+    if not get_avishan_config().AUTHENTICATION_CACHE_ENABLE:
+        return
+    if update_fields is not None and set(update_fields) <= {'last_used'}:
+        return
+
+    if isinstance(instance, AuthenticationType):
+        invalidate_authentication_object_cache(instance)
+        return
+
+    if isinstance(instance, BaseUser):
+        lookup = {'user_user_group__base_user': instance}
+    elif isinstance(instance, UserUserGroup):
+        lookup = {'user_user_group': instance}
+    elif isinstance(instance, UserGroup):
+        lookup = {'user_user_group__user_group': instance}
+    else:
+        return
+    for model in AvishanModel.get_non_abstract_models():
+        if issubclass(model, AuthenticationType):
+            for authentication_object in model.objects.filter(**lookup).only('id'):
+                invalidate_authentication_object_cache(authentication_object)
+
+
+def invalidate_response_cache(sender, instance, **kwargs):
+    """Bumps version of changed model, so cached responses including it will not be matched again"""
+    from avishan.misc import response_cache
+
+    if not response_cache.dependent_models(sender):
+        return
+    try:
+        response_cache.bump_version(sender)
+    except Exception as e:
+        print('invalidate_response_cache_error:'.upper(), e)
+
+
+def invalidate_response_cache_m2m(sender, instance, action, model, **kwargs):
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+    invalidate_response_cache(instance.__class__, instance)
+    invalidate_response_cache(model, None)
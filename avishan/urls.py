@@ -1,12 +1,18 @@
 from django.urls import path
 
-from avishan.views.class_based import AvishanModelApiView, Redoc
+from avishan.views.class_based import AvishanModelApiView, Redoc, OpenApiSpecView
 from avishan.configure import get_avishan_config
 
 urlpatterns = [
     path(f'{get_avishan_config().AVISHAN_URLS_START}'
          f'/redoc',
-         Redoc.as_view()),
+         Redoc.as_view(), name='avishan_redoc'),
+    path(f'{get_avishan_config().AVISHAN_URLS_START}'
+         f'/openapi.json',
+         OpenApiSpecView.as_view(spec_format='json'), name='avishan_openapi_json'),
+    path(f'{get_avishan_config().AVISHAN_URLS_START}'
+         f'/openapi.yaml',
+         OpenApiSpecView.as_view(spec_format='yaml'), name='avishan_openapi_yaml'),
     path(f'{get_avishan_config().AVISHAN_URLS_START}'
          f'/<str:model_plural_name>',
          AvishanModelApiView.as_view()),
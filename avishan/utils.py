@@ -140,6 +140,8 @@ def discard_monitor(url: str) -> bool:
     """
     if url.startswith(tuple(get_avishan_config().NOT_MONITORED_STARTS)):
         return True
+    if url.startswith(f'/{get_avishan_config().AVISHAN_URLS_START}/openapi.'):
+        return True
     return False
 
 
@@ -209,7 +211,9 @@ def add_token_to_response(rendered_response: HttpResponse):
     if not get_current_request().avishan.add_token or not get_current_request().avishan.authentication_object:
         delete_token_from_request(rendered_response)
     else:
-        token = encode_token(get_current_request().avishan.authentication_object)
+        token = reusable_token(get_current_request().avishan.authentication_object)
+        if token is None:
+            token = encode_token(get_current_request().avishan.authentication_object)
 
         if get_current_request().avishan.is_api:
             get_current_request().avishan.response['token'] = token
@@ -217,6 +221,29 @@ def add_token_to_response(rendered_response: HttpResponse):
             rendered_response.set_cookie('token', token)
 
 
+def reusable_token(authentication_object: 'AuthenticationType') -> Optional[str]:
+    """
+    Incoming token will be sent back unchanged if it belongs to same authentication object and login, and less than
+    TOKEN_REISSUE_AFTER_FRACTION of its lifetime has passed. Decided only from decoded token claims.
+    :return: incoming token or None if new one should be created
+    """
+    request = get_current_request()
+    decoded = request.avishan.decoded_token
+    if not request.avishan.token or not decoded:
+        return None
+    if decoded.get('at_n') != authentication_object.class_name() or decoded.get('at_id') != authentication_object.id:
+        return None
+    if authentication_object.last_login is None or decoded.get('lgn') != authentication_object.last_login.timestamp():
+        return None
+
+    lifetime = decoded['exp'] - decoded['crt']
+    if lifetime <= 0:
+        return None
+    if (timezone.now().timestamp() - decoded['crt']) / lifetime >= get_avishan_config().TOKEN_REISSUE_AFTER_FRACTION:
+        return None
+    return request.avishan.token
+
+
 def delete_token_from_request(rendered_response=None):
     if get_current_request().avishan.is_api:
         try:
@@ -250,11 +277,20 @@ def decode_token():
     import jwt
     if not get_current_request().avishan.token:
         raise AuthException(AuthException.TOKEN_NOT_FOUND)
+    from avishan.misc.token_cache import get_verified_token_cache
+
+    cached = get_verified_token_cache().get(get_current_request().avishan.token)
+    if cached is not None:
+        get_current_request().avishan.decoded_token = cached
+        get_current_request().avishan.add_token = True
+        return
     try:
         get_current_request().avishan.decoded_token = jwt.decode(
             get_current_request().avishan.token, get_avishan_config().JWT_KEY,
             algorithms=['HS256']
         )
+        get_verified_token_cache().put(get_current_request().avishan.token,
+                                       get_current_request().avishan.decoded_token)
         get_current_request().avishan.add_token = True
     except jwt.exceptions.ExpiredSignatureError:
         raise AuthException(AuthException.TOKEN_EXPIRED)
@@ -272,15 +308,21 @@ def find_and_check_user():
     if not get_current_request().avishan.decoded_token:
         AuthException(AuthException.ERROR_IN_TOKEN)
 
-    authentication_type_class = AvishanModel.get_model_with_class_name(
-        get_current_request().avishan.decoded_token['at_n']
+    authentication_type_object: Optional['AuthenticationType'] = get_cached_authentication_object(
+        get_current_request().avishan.decoded_token
     )
-    try:
-        authentication_type_object: 'AuthenticationType' = authentication_type_class.objects.get(
-            id=get_current_request().avishan.decoded_token['at_id'])
-        user_user_group = authentication_type_object.user_user_group
-    except authentication_type_class.DoesNotExist:
-        raise AuthException(AuthException.ACCOUNT_NOT_FOUND)
+    loaded_from_cache = authentication_type_object is not None
+    if not loaded_from_cache:
+        authentication_type_class = AvishanModel.get_model_with_class_name(
+            get_current_request().avishan.decoded_token['at_n']
+        )
+        try:
+            authentication_type_object = authentication_type_class.objects.select_related(
+                'user_user_group__base_user', 'user_user_group__user_group'
+            ).get(id=get_current_request().avishan.decoded_token['at_id'])
+        except authentication_type_class.DoesNotExist:
+            raise AuthException(AuthException.ACCOUNT_NOT_FOUND)
+    user_user_group = authentication_type_object.user_user_group
 
     if not user_user_group.is_active:
         raise AuthException(AuthException.GROUP_ACCOUNT_NOT_ACTIVE)
@@ -292,11 +334,76 @@ def find_and_check_user():
         get_current_request().avishan.add_token = False
         raise AuthException(AuthException.DEACTIVATED_TOKEN)
 
-    authentication_type_object.last_used = timezone.now()
-    authentication_type_object.save()
+    now = timezone.now()
+    if authentication_type_object.last_used is None or (now - authentication_type_object.last_used).total_seconds() \
+            >= get_avishan_config().AUTHENTICATION_LAST_USED_GRANULARITY_SECONDS:
+        authentication_type_object.last_used = now
+        update_authentication_last_used(authentication_type_object)
+        loaded_from_cache = False
+    if not loaded_from_cache:
+        cache_authentication_object(authentication_type_object)
     authentication_type_object._populate_current_request()
 
 
+def update_authentication_last_used(authentication_object: 'AuthenticationType'):
+    """
+    Writes "last_used" of object with a single-column update, skipping model save and its signals. Writes will be
+    deferred to background writer if AUTHENTICATION_LAST_USED_ASYNC_WRITE enabled.
+    """
+    if get_avishan_config().AUTHENTICATION_LAST_USED_ASYNC_WRITE:
+        from avishan.misc.batch_writer import get_last_used_writer
+        get_last_used_writer().enqueue(
+            (authentication_object.__class__, authentication_object.id, authentication_object.last_used)
+        )
+        return
+    authentication_object.__class__.objects.filter(id=authentication_object.id).update(
+        last_used=authentication_object.last_used
+    )
+
+
+def authentication_cache_key(class_name: str, object_id: int) -> str:
+    return f'avishan_authentication_{class_name}_{object_id}'
+
+
+def get_cached_authentication_object(decoded_token: dict) -> Optional['AuthenticationType']:
+    """
+    Finds authentication object, with its user_user_group, base_user and user_group loaded, from cache. Objects
+    cached with other login than token's, count as not found.
+    """
+    if not get_avishan_config().AUTHENTICATION_CACHE_ENABLE:
+        return None
+    from django.core.cache import caches
+
+    found = caches[get_avishan_config().AUTHENTICATION_CACHE_ALIAS].get(
+        authentication_cache_key(decoded_token['at_n'], decoded_token['at_id'])
+    )
+    if found is None or found.last_login is None or found.last_login.timestamp() != decoded_token['lgn']:
+        return None
+    return found
+
+
+def cache_authentication_object(authentication_object: 'AuthenticationType'):
+    if not get_avishan_config().AUTHENTICATION_CACHE_ENABLE:
+        return
+    from django.core.cache import caches
+
+    caches[get_avishan_config().AUTHENTICATION_CACHE_ALIAS].set(
+        authentication_cache_key(authentication_object.class_name(), authentication_object.id),
+        authentication_object,
+        get_avishan_config().AUTHENTICATION_CACHE_SECONDS
+    )
+
+
+def invalidate_authentication_object_cache(authentication_object: 'AuthenticationType'):
+    if not get_avishan_config().AUTHENTICATION_CACHE_ENABLE:
+        return
+    from django.core.cache import caches
+
+    caches[get_avishan_config().AUTHENTICATION_CACHE_ALIAS].delete(
+        authentication_cache_key(authentication_object.class_name(), authentication_object.id)
+    )
+
+
 def create_avishan_config_file(app_name: str = None):
     # todo 0.2.0 create config file and its classes. add needed fields
     """
@@ -6,6 +6,7 @@ from django.core.handlers.wsgi import WSGIRequest
 from django.db.models import QuerySet
 from django.http import JsonResponse
 from django.http.response import HttpResponseBase
+from django.urls import reverse
 from django.utils import timezone
 from django.views import View
 
@@ -56,7 +57,8 @@ class AvishanView(View):
         request.avishan.is_api = self.is_api
         if self.track_it and not request.avishan.is_tracked:
             request.avishan.is_tracked = True
-            request.avishan.request_track_object = RequestTrack.objects.create()
+            """Saved when request finishes, or earlier if other objects (like Activity) refer to it"""
+            request.avishan.request_track_object = RequestTrack()
 
     def http_method_not_allowed(self, request, *args, **kwargs):
         # noinspection PyTypeHints
@@ -133,6 +135,10 @@ class AvishanApiView(AvishanView):
 
         super().dispatch(request, *args, **kwargs)
         if request.avishan.can_touch_response:
+            from avishan.misc.streaming import has_streamed_value
+            if has_streamed_value(self.response):
+                """Streamed values will be encoded by Wrapper while sending response"""
+                return JsonResponse({})
             return JsonResponse(self.response)
         return self.response
 
@@ -225,10 +231,9 @@ class AvishanModelApiView(AvishanApiView):
         if model_item_id is not None:
             self.model_item = self.model.get(avishan_raise_400=True, id=int(model_item_id))
         if self.model_function_name is not None:
-            for direct_callable in self.model_descripted.methods:
-                if self.model_function_name == direct_callable.name:
-                    self.direct_callable = direct_callable
-                    break
+            self.direct_callable = request.avishan.project.find_direct_callable(
+                self.model, self.model_function_name, request.method
+            )
             if not self.direct_callable:
                 raise AuthException(AuthException.METHOD_NOT_DIRECT_CALLABLE)
             self.authenticate = self.direct_callable.authenticate
@@ -246,6 +251,16 @@ class AvishanModelApiView(AvishanApiView):
         # noinspection PyTypeHints
         request.avishan: AvishanRequestStorage
 
+        from avishan.misc import response_cache
+        if response_cache.is_cached(self.model, self.model_function_name) and not request.avishan.stream_response:
+            self.cached_get(request, *args, **kwargs)
+            return
+        self.get_response(request)
+
+    def get_response(self, request):
+        # noinspection PyTypeHints
+        request.avishan: AvishanRequestStorage
+
         if self.model_function_name == 'get':
             result = self.model.get(id=self.model_item.id)
         else:
@@ -259,6 +274,37 @@ class AvishanModelApiView(AvishanApiView):
         else:
             self.response = response
 
+    def cached_get(self, request, *args, **kwargs):
+        """
+        Serves response from cache, or 304 if client already has it. Cached value is every key added to response by
+        get_response (data, pagination, ...).
+        """
+        # noinspection PyTypeHints
+        request.avishan: AvishanRequestStorage
+        from django.http import HttpResponseNotModified
+        from avishan.misc import response_cache
+
+        key = response_cache.response_key(request, self.model, self.model_function_name)
+        etag = response_cache.etag(key)
+        if etag in [item.strip() for item in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            request.avishan.can_touch_response = False
+            self.response = HttpResponseNotModified()
+            self.response['ETag'] = etag
+            return
+
+        cached = response_cache.get_response(key)
+        if cached is None:
+            previous_keys = set(self.response.keys())
+            self.get_response(request)
+            if not request.avishan.can_touch_response or request.avishan.exception is not None or \
+                    request.avishan.status_code != 200:
+                return
+            cached = {name: value for name, value in self.response.items() if name not in previous_keys}
+            response_cache.set_response(key, cached, self.model.response_cache_seconds)
+        else:
+            self.response.update(cached)
+        request.avishan.etag = etag
+
     def post(self, request, *args, **kwargs):
         # noinspection PyTypeHints
         request.avishan: AvishanRequestStorage
@@ -294,12 +340,20 @@ class AvishanModelApiView(AvishanApiView):
             request.avishan.can_touch_response = False
             return returned
         if isinstance(returned, QuerySet):
+            if request.avishan.stream_response and request.avishan.is_api and issubclass(returned.model, AvishanModel):
+                from avishan.misc.streaming import StreamedQuerySet
+                return StreamedQuerySet(returned)
+            if issubclass(returned.model, AvishanModel):
+                returned = returned.model.to_dict_load_related(returned)
             return [item.to_dict() for item in returned]
         elif isinstance(returned, list):
             if len(returned) > 0 and isinstance(returned[0], AvishanModel):
+                if all(type(item) is type(returned[0]) for item in returned):
+                    returned[0].to_dict_load_related(returned)
                 return [item.to_dict() for item in returned]
             return returned
         elif isinstance(returned, AvishanModel):
+            returned.to_dict_load_related(returned)
             return returned.to_dict()
         else:
             return returned
@@ -339,11 +393,9 @@ class AvishanModelApiView(AvishanApiView):
             elif function_attribute.type is function_attribute.TYPE.ARRAY and \
                     inspect.isclass(function_attribute.type_of) and \
                     issubclass(function_attribute.type_of, AvishanModel):
-                cleaned[function_attribute.name] = [
-                    self._parse_request_object(
-                        function_attribute=function_attribute, target_dict=item
-                    ) for item in kwargs[function_attribute.name]
-                ]
+                cleaned[function_attribute.name] = self._parse_request_object_list(
+                    function_attribute=function_attribute, target_list=kwargs[function_attribute.name]
+                )
             elif function_attribute.type is function_attribute.TYPE.FILE:
                 raise NotImplementedError()
             else:
@@ -374,6 +426,29 @@ class AvishanModelApiView(AvishanApiView):
 
         return function_attribute.type_of.request_arg_get_from_dict(target_dict)
 
+    @staticmethod
+    def _parse_request_object_list(function_attribute: FunctionAttribute, target_list: list) -> list:
+        """Parse array of objects
+
+        Same as _parse_request_object for each item, but objects referenced by id are fetched in one query
+
+        :param FunctionAttribute function_attribute: corresponding attribute data
+        :param list target_list: request data
+        :return: cleaned objects
+        """
+
+        if not isinstance(target_list, list):
+            raise ErrorMessageException(f'value for "{function_attribute.name}" must be list')
+        for target_dict in target_list:
+            if target_dict is not None and not isinstance(target_dict, dict):
+                raise ErrorMessageException(f'items of "{function_attribute.name}" must be dict consist of id or '
+                                            f'other unique values so that db can find corresponding object')
+
+        found = iter(function_attribute.type_of.request_arg_get_from_dict_list(
+            [item for item in target_list if item is not None]
+        ))
+        return [None if item is None else next(found) for item in target_list]
+
 
 class Redoc(AvishanTemplateView):
     template_file_address = 'avishan/redoc.html'
@@ -381,11 +456,26 @@ class Redoc(AvishanTemplateView):
     track_it = False
 
     def get(self, request, *args, **kwargs):
-        from avishan.libraries.openapi3 import OpenApi
+        self.context['spec_url'] = reverse('avishan_openapi_json')
+        return self.render()
 
-        open_api_yaml = OpenApi().export_yaml()
 
-        text_file = open('static/openapi.yaml', 'w+')
-        text_file.write(open_api_yaml)
-        text_file.close()
-        return self.render()
+class OpenApiSpecView(View):
+    """Serves OpenApi spec built once per process, with ETag so clients can revalidate it without downloading"""
+    spec_format: str = 'json'
+
+    def get(self, request, *args, **kwargs):
+        from django.http import HttpResponse, HttpResponseNotModified
+        from avishan.misc.openapi_spec import get_openapi_spec
+
+        spec = get_openapi_spec()
+        if spec.etag in [item.strip() for item in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                spec.export(self.spec_format),
+                content_type='application/json' if self.spec_format == 'json' else 'application/yaml'
+            )
+        response['ETag'] = spec.etag
+        response['Cache-Control'] = f'public, max-age={get_avishan_config().OPENAPI_SPEC_MAX_AGE_SECONDS}'
+        return response
@@ -0,0 +1,2 @@
+"""Config class should exist before avishan models are imported, so it is imported with the app"""
+from bench_app import avishan_config  # noqa: F401
@@ -0,0 +1,19 @@
+from avishan.configure import AvishanConfigFather
+
+
+class AvishanConfig(AvishanConfigFather):
+    PROJECT_NAME = 'bench_project'
+    MONITORED_APPS_NAMES = ['avishan', 'bench_app']
+    JWT_KEY = 'benchmarks'
+    FAKER_SEED = 0
+
+    """Publishers are readable without token, to measure unauthenticated requests"""
+    CRUD_AUTHENTICATE = {
+        'Publisher': {
+            'all': False,
+            'get': False,
+            'create': True,
+            'update': True,
+            'remove': True
+        }
+    }
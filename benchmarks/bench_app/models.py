@@ -0,0 +1,50 @@
+from django.db import models
+
+from avishan.models import AvishanModel
+
+
+class Publisher(AvishanModel):
+    name = models.CharField(max_length=255)
+    city = models.CharField(max_length=255, blank=True, null=True)
+
+    bulk_insert_custom_create = True
+
+    @classmethod
+    def create(cls, name: str, city: str = None):
+        return super().create(name=name, city=city)
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(AvishanModel):
+    title = models.CharField(max_length=255)
+
+    bulk_insert_custom_create = True
+
+    @classmethod
+    def create(cls, title: str):
+        return super().create(title=title)
+
+    def __str__(self):
+        return self.title
+
+
+class Book(AvishanModel):
+    title = models.CharField(max_length=255)
+    pages = models.IntegerField(default=0)
+    publisher = models.ForeignKey(Publisher, on_delete=models.CASCADE, related_name='books')
+    tags = models.ManyToManyField(Tag, blank=True, related_name='books')
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    bulk_insert_custom_create = True
+
+    @classmethod
+    def create(cls, title: str, pages: int, publisher: Publisher):
+        return super().create(title=title, pages=pages, publisher=publisher)
+
+    def update(self, title: str, pages: int):
+        return super().update(title=title, pages=pages)
+
+    def __str__(self):
+        return self.title
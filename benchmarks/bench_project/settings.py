@@ -0,0 +1,48 @@
+"""Minimal project for benchmarks: in-memory SQLite, local memory cache and avishan middlewares"""
+
+SECRET_KEY = 'benchmarks'
+DEBUG = False
+ALLOWED_HOSTS = ['testserver', 'localhost']
+
+INSTALLED_APPS = [
+    'bench_app',
+    'django.contrib.contenttypes',
+    'django.contrib.auth',
+    'corsheaders',
+    'avishan',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'crum.CurrentRequestUserMiddleware',
+    'avishan.middlewares.Wrapper',
+]
+
+ROOT_URLCONF = 'bench_project.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {},
+    },
+]
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+USE_TZ = True
+TIME_ZONE = 'UTC'
+STATIC_URL = '/static/'
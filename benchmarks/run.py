@@ -0,0 +1,295 @@
+"""
+Benchmarks of avishan request pipeline, against the bundled project (in-memory SQLite, in-process test client).
+
+Usage, from repository root:
+    python benchmarks/run.py [--iterations 200] [--output result.json] [--compare previous.json] [--only name ...]
+
+Each scenario reports throughput, latency percentiles (milliseconds), database queries per operation and response
+status codes, as JSON. With --compare, p50 latency and mean queries are compared with an earlier result file, so
+results of two commits can be diffed.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Callable, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+
+def setup_django():
+    sys.path.insert(0, REPOSITORY_DIR)
+    sys.path.insert(0, BENCHMARKS_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_project.settings')
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+class Fixtures:
+    """Rows shared by scenarios. Books have a publisher and three tags, so to_dict serializes nested objects"""
+
+    def __init__(self, books_count: int = 1000):
+        from django.utils import timezone
+        from avishan.models import BaseUser, UserGroup, UserUserGroup, VisitorKeyAuthentication
+        from avishan.utils import encode_token
+        from bench_app.models import Publisher, Tag, Book
+
+        """SQLite bulk_create does not return ids, so rows are fetched again after each insert"""
+        Publisher.objects.bulk_create(
+            [Publisher(name=f'publisher {index}', city=f'city {index % 7}') for index in range(20)]
+        )
+        self.publishers = list(Publisher.objects.order_by('id'))
+        Tag.objects.bulk_create([Tag(title=f'tag {index}') for index in range(30)])
+        self.tags = list(Tag.objects.order_by('id'))
+        Book.objects.bulk_create([
+            Book(title=f'book {index}', pages=index % 900, publisher=self.publishers[index % len(self.publishers)])
+            for index in range(books_count)
+        ])
+        self.books = list(Book.objects.order_by('id'))
+        through = Book.tags.through
+        through.objects.bulk_create([
+            through(book_id=book.id, tag_id=self.tags[(book.id + offset) % len(self.tags)].id)
+            for book in self.books for offset in range(3)
+        ])
+
+        user_group = UserGroup.objects.create(title='benchmark', token_valid_seconds=24 * 60 * 60)
+        user_user_group = UserUserGroup.objects.create(base_user=BaseUser.objects.create(), user_group=user_group)
+        self.authentication = VisitorKeyAuthentication.objects.create(
+            key='b' * 40, user_user_group=user_user_group, last_login=timezone.now()
+        )
+        self.token = encode_token(self.authentication)
+
+
+class Scenario:
+    def __init__(self, name: str, function: Callable[[int], Optional[int]], description: str):
+        self.name = name
+        self.function = function
+        self.description = description
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest rank percentile of sorted values"""
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def measure(scenario: Scenario, iterations: int, warmup: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for index in range(warmup):
+        scenario.function(index)
+
+    timings = []
+    queries = []
+    status_codes = Counter()
+    started = time.perf_counter()
+    for index in range(warmup, warmup + iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            status_code = scenario.function(index)
+            timings.append(time.perf_counter() - start)
+        queries.append(len(context.captured_queries))
+        if status_code is not None:
+            status_codes[str(status_code)] += 1
+    total = time.perf_counter() - started
+
+    timings_ms = sorted(item * 1000 for item in timings)
+    return {
+        'name': scenario.name,
+        'description': scenario.description,
+        'iterations': iterations,
+        'total_seconds': round(total, 4),
+        'operations_per_second': round(iterations / sum(timings), 2),
+        'latency_ms': {
+            'mean': round(statistics.mean(timings_ms), 3),
+            'p50': round(percentile(timings_ms, 0.50), 3),
+            'p90': round(percentile(timings_ms, 0.90), 3),
+            'p99': round(percentile(timings_ms, 0.99), 3),
+            'max': round(timings_ms[-1], 3),
+        },
+        'queries': {
+            'mean': round(statistics.mean(queries), 2),
+            'max': max(queries),
+        },
+        'status_codes': dict(status_codes),
+    }
+
+
+def build_scenarios(fixtures: Fixtures, iterations: int, warmup: int) -> List[Scenario]:
+    from django.test import Client
+    from bench_app.models import Book
+
+    client = Client()
+    headers = {'HTTP_AUTHORIZATION': 'Token ' + fixtures.token}
+    books = fixtures.books
+    publishers = fixtures.publishers
+
+    """Books removed by "remove" scenario, created up front so every iteration deletes an existing object"""
+    Book.objects.bulk_create([
+        Book(title=f'removable {index}', pages=1, publisher=publishers[0]) for index in range(iterations + warmup)
+    ])
+    removable_ids = list(
+        Book.objects.filter(title__startswith='removable ').order_by('id').values_list('id', flat=True)
+    )
+
+    def get_json(url: str, authenticated: bool = True) -> int:
+        return client.get(url, **(headers if authenticated else {})).status_code
+
+    def send_json(method: str, url: str, data: dict) -> int:
+        return getattr(client, method)(url, data=json.dumps(data), content_type='application/json',
+                                       **headers).status_code
+
+    def to_dict_nested(index: int) -> None:
+        objects = list(Book.objects.order_by('id')[:100])
+        Book.to_dict_load_related(objects)
+        for item in objects:
+            item.to_dict()
+
+    return [
+        Scenario(
+            'wrapper_unauthenticated_get',
+            lambda index: get_json(f'/api/av1/publishers/{publishers[index % len(publishers)].id}',
+                                   authenticated=False),
+            'Wrapper and model get, without token'
+        ),
+        Scenario(
+            'wrapper_authenticated_get',
+            lambda index: get_json(f'/api/av1/publishers/{publishers[index % len(publishers)].id}'),
+            'Wrapper with decode_token and find_and_check_user, and model get'
+        ),
+        Scenario(
+            'wrapper_unauthenticated_protected',
+            lambda index: get_json('/api/av1/books', authenticated=False),
+            'Wrapper rejecting a protected api without token, including its RequestTrack. Expected status is 403'
+        ),
+        Scenario(
+            'model_get',
+            lambda index: get_json(f'/api/av1/books/{books[index % len(books)].id}'),
+            'AvishanModelApiView get of a book with publisher and tags'
+        ),
+        Scenario(
+            'model_all',
+            lambda index: get_json('/api/av1/publishers'),
+            'AvishanModelApiView all, every publisher'
+        ),
+        Scenario(
+            'model_all_filtered_paginated',
+            lambda index: get_json(f'/api/av1/books?title__search=book&pages__gte={index % 100}'
+                                   f'&sort=(-pages)&page={index % 10 + 1}&page_size=20'),
+            'queryset_handler with filters, sort and page pagination of books'
+        ),
+        Scenario(
+            'model_all_cursor_paginated',
+            lambda index: get_json('/api/av1/books?cursor=&page_size=20&sort=(-pages)'),
+            'queryset_handler with cursor pagination of books'
+        ),
+        Scenario(
+            'model_create',
+            lambda index: send_json('post', '/api/av1/books', {
+                'title': f'created {index}', 'pages': index, 'publisher': {'id': publishers[0].id}
+            }),
+            'AvishanModelApiView create with related object lookup'
+        ),
+        Scenario(
+            'model_update',
+            lambda index: send_json('put', f'/api/av1/books/{books[index % len(books)].id}', {
+                'title': f'updated {index}', 'pages': index
+            }),
+            'AvishanModelApiView update'
+        ),
+        Scenario(
+            'model_remove',
+            lambda index: client.delete(f'/api/av1/books/{removable_ids[index]}', **headers).status_code,
+            'AvishanModelApiView remove'
+        ),
+        Scenario(
+            'to_dict_nested',
+            to_dict_nested,
+            'to_dict of 100 books with publisher and tags, relations loaded with to_dict_load_related'
+        ),
+    ]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPOSITORY_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, previous: dict) -> List[dict]:
+    previous_results = {item['name']: item for item in previous['results']}
+    rows = []
+    for item in current['results']:
+        old = previous_results.get(item['name'])
+        if old is None:
+            continue
+        rows.append({
+            'name': item['name'],
+            'p50_ms': [old['latency_ms']['p50'], item['latency_ms']['p50']],
+            'p50_change_percent': round(
+                (item['latency_ms']['p50'] - old['latency_ms']['p50']) / old['latency_ms']['p50'] * 100, 1
+            ) if old['latency_ms']['p50'] else None,
+            'queries_mean': [old['queries']['mean'], item['queries']['mean']],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of avishan request pipeline')
+    parser.add_argument('--iterations', type=int, default=200, help='Measured operations per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured operations before each scenario')
+    parser.add_argument('--books', type=int, default=1000, help='Books created as fixtures')
+    parser.add_argument('--only', nargs='*', help='Scenario names to run')
+    parser.add_argument('--output', type=str, help='Write JSON result to this file, instead of stdout')
+    parser.add_argument('--compare', type=str, help='Earlier JSON result to compare with')
+    args = parser.parse_args()
+
+    setup_django()
+
+    import django
+
+    fixtures = Fixtures(books_count=args.books)
+    scenarios = build_scenarios(fixtures, iterations=args.iterations, warmup=args.warmup)
+    if args.only:
+        scenarios = [item for item in scenarios if item.name in args.only]
+
+    result = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'books': args.books,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': [measure(scenario, iterations=args.iterations, warmup=args.warmup) for scenario in scenarios],
+    }
+    if args.compare:
+        with open(args.compare) as file:
+            result['comparison'] = compare(result, json.load(file))
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
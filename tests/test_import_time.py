@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip('django')
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+"""Seconds allowed for setting up django with avishan, which imports avishan.models"""
+IMPORT_BUDGET_SECONDS = float(os.environ.get('AVISHAN_IMPORT_BUDGET_SECONDS', 5))
+
+"""Heavy optional dependencies that importing models should not load"""
+DEFERRED_MODULES = ['faker', 'yaml']
+
+SCRIPT = textwrap.dedent('''
+    import json
+    import sys
+    import time
+
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth', 'avishan'],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        USE_TZ=True,
+    )
+    start = time.perf_counter()
+    django.setup()
+    import avishan.models
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'elapsed': elapsed,
+        'modules': [name for name in sys.modules.keys() if name.split('.')[0] in %r],
+    }))
+''' % DEFERRED_MODULES)
+
+
+@pytest.fixture(scope='module')
+def import_result() -> dict:
+    """Fresh interpreter, so modules imported by other tests do not count"""
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT], cwd=REPOSITORY_DIR)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def test_models_import_does_not_import_deferred_modules(import_result):
+    assert import_result['modules'] == []
+
+
+def test_models_import_time_budget(import_result):
+    assert import_result['elapsed'] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip('django')
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = textwrap.dedent('''
+    import json
+    import os
+    import sys
+
+    sys.path.insert(0, 'benchmarks')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bench_project.settings')
+
+    import django
+    from django.core.management import call_command
+    from django.test import Client
+
+    django.setup()
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    from avishan.models import RequestTrack
+
+    response = Client(raise_request_exception=False).get('/api/av1/books')
+    print(json.dumps({
+        'status_code': response.status_code,
+        'tracks': list(RequestTrack.objects.values_list('status_code', 'view_execution_milliseconds')),
+    }))
+''')
+
+
+@pytest.fixture(scope='module')
+def unauthenticated_result() -> dict:
+    """Benchmark project in a fresh interpreter, so django settings of other tests do not matter"""
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT], cwd=REPOSITORY_DIR)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def test_unauthenticated_request_to_protected_api_is_rejected(unauthenticated_result):
+    assert unauthenticated_result['status_code'] == 403
+
+
+def test_unauthenticated_request_is_tracked_without_view_time(unauthenticated_result):
+    """View is not run when authentication fails, so its execution time is 0"""
+    assert unauthenticated_result['tracks'] == [[403, 0]]